@@ -4,7 +4,7 @@ import re
 from argparse import Namespace
 from collections import defaultdict
 from functools import partial
-from typing import Any, Callable, Dict, List, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import gymnasium as gym
 import numpy as np
@@ -12,7 +12,7 @@ from nle import nethack
 from nle.env.base import NLE
 from nle.nethack import actions as A
 from nle_utils.blstats import BLStats
-from nle_utils.glyph import SHOP, G
+from nle_utils.glyph import SHOP
 from numpy import int64, ndarray
 from scipy import ndimage
 
@@ -21,14 +21,18 @@ from nle_code_wrapper.bot.entity import Entity
 from nle_code_wrapper.bot.exceptions import BotFinished, BotPanic
 from nle_code_wrapper.bot.inventory import InventoryManager
 from nle_code_wrapper.bot.level import Level
+from nle_code_wrapper.bot.observation import ObservationBuffer, ObservationChanges, StepView
 from nle_code_wrapper.bot.pathfinder import Movements, Pathfinder
 from nle_code_wrapper.bot.pvp import Pvp
 from nle_code_wrapper.bot.strategy import strategy
 from nle_code_wrapper.bot.trap_tracker import TrapTracker
-from nle_code_wrapper.utils import utils
+from nle_code_wrapper.utils.glyph_categories import GC, glyph_categories, is_category
 from nle_code_wrapper.utils.inspect import check_strategy_parameters
 from nle_code_wrapper.utils.strategies import corridor_detection, room_detection
 
+# observation fields the inventory is parsed from, blstats tell us if we are blind or hallucinating
+INVENTORY_KEYS = ("inv_strs", "inv_letters", "inv_oclasses", "inv_glyphs", "blstats")
+
 
 def make_primitive_strategy(action_int: int, name: str, doc: str) -> Callable:
     """Creates a strategy function that performs a single low-level NLE action."""
@@ -62,6 +66,10 @@ class Bot:
         self.inventory_manager: InventoryManager = InventoryManager(self)
         self.pvp: Pvp = Pvp(self)
         self.trap_tracker: TrapTracker = TrapTracker(self)
+        self.observation_buffer = ObservationBuffer()
+        self.current_view: Optional[StepView] = None
+        self.last_view: Optional[StepView] = None
+        self.observation_changes = ObservationChanges()
 
         self.strategies: dict[str, Callable] = {}
         self.panics: list[Callable] = []
@@ -122,13 +130,18 @@ class Bot:
         self.overview = {}
         self.terrain_features = defaultdict(dict)
         self.shops = defaultdict(list)
+        # version of the labeled rooms the "shops" penalty of each level was computed from
+        self.shop_penalty_versions = {}
         self.last_prayer = None
 
         self._no_progress_count = 0
+        self.observation_changes.reset()
 
         self.current_obs, self.current_info = self.env.reset(**kwargs)
-        self.last_obs = copy.deepcopy(self.current_obs)
-        self.last_info = copy.deepcopy(self.current_info)
+        self.current_view = StepView(self.current_obs)
+        self.last_obs = self.observation_buffer.snapshot(self.current_obs)
+        self.last_view = StepView(self.last_obs)
+        self.last_info = copy.copy(self.current_info)
 
         self.update()
         self.start_glyph = self.entity.glyph
@@ -148,6 +161,8 @@ class Bot:
 
     def internal_step(self, action: int) -> None:
         obs, reward, self.terminated, self.truncated, info = self.env.step(self.env.actions.index(action))
+        # NLE updated the current observation in place, the fields computed so far are stale
+        self.current_view = StepView(self.current_obs)
 
         if self.terminated or self.truncated:
             raise BotFinished
@@ -161,12 +176,16 @@ class Bot:
         Args:
             action: action to take
         """
-        self.last_obs = copy.deepcopy(self.current_obs)
-        self.last_info = copy.deepcopy(self.current_info)
+        # NLE reuses the observation arrays, they are copied into preallocated buffers
+        self.last_obs = self.observation_buffer.snapshot(self.current_obs)
+        # fields we already computed for the current observation are reused for the last one
+        self.last_view = self.current_view.carry(self.last_obs)
+        self.last_info = copy.copy(self.current_info)
         try:
             self.current_obs, reward, self.terminated, self.truncated, self.current_info = self.env.step(
                 self.env.actions.index(action)
             )
+            self.current_view = StepView(self.current_obs)
         except ValueError as e:
             # Handle the case where the action is not in the list of allowed actions,
             # many minihack environments only allow subset of possible actions
@@ -390,6 +409,7 @@ class Bot:
 
         self.blstats = self.get_blstats(self.current_obs)
         self.glyphs = self.get_glyphs(self.current_obs)
+        self.categories = self.get_categories(self.current_obs)
         self.message = self.get_message(self.current_obs)
         self.tty_chars = self.get_tty_chars(self.current_obs)
         self.tty_colors = self.get_tty_colors(self.current_obs)
@@ -398,23 +418,38 @@ class Bot:
         self.entities = self.get_entities(self.current_obs)
         self.current_level = self.get_current_level(self.current_obs)
 
-        self.inventory_manager.update()
+        # subsystems which depend only on the observation are skipped when it didn't change,
+        # e.g. while we navigate menus, the others depend on the state strategies change as well
+        changes = self.observation_changes
+        if changes.changed("inventory", self.current_obs, INVENTORY_KEYS):
+            self.inventory_manager.update()
         self.character.update()
         self.movements.update()
-        self.pathfinder.update()
+        if changes.changed("pathfinder", self.current_obs, ("blstats",)):
+            self.pathfinder.update()
         self.pvp.update()
         self.trap_tracker.update()
 
         # those two right now only used for display purposes
-        terrain_needs_update = self.current_level.update(self.glyphs, self.blstats)
-        if terrain_needs_update:
-            self.update_terrain_features(self.glyphs, self.blstats)
+        if changes.changed("level", self.current_obs, ("glyphs", "blstats")):
+            if self.current_level.update(self.glyphs, self.blstats).features_changed:
+                self.update_terrain_features(self.glyphs, self.blstats)
 
         # order matters, update shops after updating pathfinder
         self.update_shops()
 
+    def get_view(self, last_obs) -> StepView:
+        """
+        Returns:
+            StepView of the observation, the current and the last observation share their views between calls
+        """
+        for view in (self.current_view, self.last_view):
+            if view is not None and view.obs is last_obs:
+                return view
+        return StepView(last_obs)
+
     def get_blstats(self, last_obs) -> BLStats:
-        return BLStats(*last_obs["blstats"])
+        return self.get_view(last_obs).blstats
 
     def get_glyphs(self, last_obs) -> ndarray:
         """
@@ -424,6 +459,13 @@ class Bot:
         """
         return last_obs["glyphs"]
 
+    def get_categories(self, last_obs) -> ndarray:
+        """
+        Returns:
+            2D numpy array with the categories of the glyphs, see `glyph_categories`
+        """
+        return self.get_view(last_obs).categories
+
     def get_message(self, last_obs) -> str:
         """
         Returns:
@@ -445,28 +487,20 @@ class Bot:
         Returns:
             Entity object with the player
         """
-        blstats = self.get_blstats(last_obs)
-        position = (blstats.y, blstats.x)
-        return Entity(position, self.get_glyphs(last_obs)[position])
+        return self.get_view(last_obs).entity
 
     def get_entities(self, last_obs) -> List[Union[Any, Entity]]:
         """
         Returns:
             List of Entity objects with the monsters
         """
-        glyphs = self.get_glyphs(last_obs)
-        blstats = self.get_blstats(last_obs)
-        monster_mask = utils.isin(glyphs, G.MONS, G.INVISIBLE_MON)
-        monster_mask[blstats.y, blstats.x] = 0
-
-        return [Entity(position, glyphs[position]) for position in list(zip(*np.where(monster_mask)))]
+        return self.get_view(last_obs).entities
 
     def get_current_level(self, last_obs) -> Level:
         """
         :return: Level object of the current level
         """
-        blstats = self.get_blstats(last_obs)
-        key = (blstats.dungeon_number, blstats.level_number)
+        key = self.get_view(last_obs).level_key
         if key not in self.levels:
             self.levels[key] = Level(*key)
         return self.levels[key]
@@ -599,8 +633,8 @@ class Bot:
         revelable_positions = get_revelable_positions(self, labeled_rooms)
 
         dilated_corridors = ndimage.binary_dilation(labeled_corridors)
-        dilated_doors = ndimage.binary_dilation(utils.isin(self.glyphs, G.DOOR_CLOSED))
-        dilated_bars = ndimage.binary_dilation(utils.isin(self.glyphs, G.BARS))
+        dilated_doors = ndimage.binary_dilation(is_category(self.categories, GC.DOOR_CLOSED))
+        dilated_bars = ndimage.binary_dilation(is_category(self.categories, GC.BARS))
 
         rooms_info = []
         for room_id in range(1, num_rooms + 1):
@@ -735,20 +769,21 @@ class Bot:
         """
         Returns the terrain features of the current level.
         """
-        name_glyph = {
-            "stairs down": G.STAIR_DOWN,
-            "stairs up": G.STAIR_UP,
-            "altar": G.ALTAR,
-            "fountain": G.FOUNTAIN,
-            "throne": G.THRONE,
-            "sink": G.SINK,
-            "trap": G.TRAPS,
-            "grave": G.GRAVE,
+        name_category = {
+            "stairs down": GC.STAIR_DOWN,
+            "stairs up": GC.STAIR_UP,
+            "altar": GC.ALTAR,
+            "fountain": GC.FOUNTAIN,
+            "throne": GC.THRONE,
+            "sink": GC.SINK,
+            "trap": GC.TRAPS,
+            "grave": GC.GRAVE,
         }
 
+        categories = glyph_categories(glyphs)
         terrain_features = {}
-        for name, glyph in name_glyph.items():
-            mask = utils.isin(glyphs, glyph)
+        for name, category in name_category.items():
+            mask = is_category(categories, category)
             positions = np.argwhere(mask)
             if len(positions) > 0:
                 terrain_features[name] = positions
@@ -758,35 +793,52 @@ class Bot:
     def update_shops(self):
         from nle_code_wrapper.utils.strategies import room_detection
 
-        shop_type = None
+        key = (self.blstats.dungeon_number, self.blstats.level_number)
         matches = re.search(f"Welcome( again)? to [a-zA-Z' ]*({'|'.join(SHOP.name2id.keys())})!", self.message)
 
-        if matches is None:
-            return
-
-        shop_name = matches.groups()[1]
-        assert shop_name in SHOP.name2id, shop_name
-        shop_type = SHOP.name2id[shop_name]
-        shop_string = SHOP.id2string[shop_type]
+        if matches is not None:
+            shop_name = matches.groups()[1]
+            assert shop_name in SHOP.name2id, shop_name
+            shop_type = SHOP.name2id[shop_name]
+            shop_string = SHOP.id2string[shop_type]
 
-        distances = self.pathfinder.distances(self.entity.position)
-        shop_keepers = [entity.position for entity in self.entities if entity.name == "shopkeeper"]
+            distances = self.pathfinder.distances(self.entity.position)
+            shop_keepers = [entity.position for entity in self.entities if entity.name == "shopkeeper"]
 
-        closest_shop_keeper = min(
-            [sk for sk in shop_keepers],
-            key=lambda sk: distances.get(sk, np.inf),
-            default=None,
-        )
+            closest_shop_keeper = min(
+                [sk for sk in shop_keepers],
+                key=lambda sk: distances.get(sk, np.inf),
+                default=None,
+            )
 
-        # assert closest_shop_keeper is not None, "Could not find shopkeeper"
+            # assert closest_shop_keeper is not None, "Could not find shopkeeper"
 
-        self.shops[(self.blstats.dungeon_number, self.blstats.level_number)].append(
-            {
+            shop_info = {
                 "name": shop_string,
                 "type": shop_type,
                 "position": closest_shop_keeper,
             }
-        )
+            # the message stays on the screen for a few updates, we record the shop once
+            if shop_info not in self.shops[key]:
+                self.shops[key].append(shop_info)
+                self.shop_penalty_versions.pop(key, None)
+                # label the rooms, the penalty is computed from them below
+                room_detection(self)
+
+        # shops are rooms, paths avoid them unless there is no other way,
+        # the penalty follows the rooms whenever they are labeled again
+        features = self.current_level.dungeon_features
+        if not self.shops.get(key) or features is None or self.shop_penalty_versions.get(key) == features.version:
+            return
+        self.shop_penalty_versions[key] = features.version
+
+        shop_labels = [
+            features.labeled_rooms[shop_info["position"]]
+            for shop_info in self.shops[key]
+            if shop_info["position"] is not None
+        ]
+        shop_mask = np.isin(features.labeled_rooms, [label for label in shop_labels if label != 0])
+        self.current_level.set_penalty("shops", np.where(shop_mask, self.pathfinder.shop_cost, 0))
 
     @property
     def inventory(self):
@@ -794,7 +846,7 @@ class Bot:
 
     @property
     def engulfed(self):
-        return utils.isin(self.glyphs, G.SWALLOW).any()
+        return is_category(self.categories, GC.SWALLOW).any()
 
     @property
     def stone(self):
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from nle_code_wrapper.bot.inventory.item import Item
 from nle_code_wrapper.bot.inventory.item_database import ItemDatabase
 from nle_code_wrapper.bot.inventory.item_parser import ItemParser
 from nle_code_wrapper.bot.inventory.properties import ArmorClass, ItemCategory
 
+# the character can only squeeze diagonally between tight gaps when carrying less than this
+SQUEEZE_WEIGHT = 600
+
 
 class Inventory:
     def __init__(self):
         self.items: Dict[int, Item] = {}
         self.item_parser = ItemParser()
+        # total weight, recomputed lazily after the items change
+        self._weight: Optional[int] = None
+        # raw inv_letters and inv_strs of the last update, and the raw inv_strs row of every item
+        self._buffers: Optional[Tuple[bytes, bytes]] = None
+        self._rows: Dict[int, bytes] = {}
         self.inventory_categories = {
             "coins": [ItemCategory.COIN],
             "amulets": [ItemCategory.AMULET],
@@ -39,6 +47,11 @@ class Inventory:
         }
 
     def update(self, inv_strs, inv_letters, inv_oclasses, inv_glyphs, item_database: ItemDatabase):
+        # the inventory rarely changes, nothing to parse if the buffers are the same
+        buffers = (bytes(inv_letters), bytes(inv_strs))
+        if buffers == self._buffers:
+            return
+
         old_keys = set(self.items.keys())
         new_keys = set()
         for i in range(len(inv_strs)):
@@ -50,14 +63,23 @@ class Inventory:
 
             new_keys.add(letter)
 
-            text = bytes(inv_str).decode("latin-1").strip("\0")
+            # only the rows which changed are parsed again
+            row = bytes(inv_str)
+            if letter in self.items and self._rows.get(letter) == row:
+                continue
+            self._rows[letter] = row
+
+            text = row.decode("latin-1").strip("\0")
             properties = self.item_parser(text)
 
             if letter in self.items:
                 # sometimes item text changes
+                if self.items[letter].text != text:
+                    self._weight = None
                 self.items[letter].text = text
                 self.items[letter].update_properties(**properties)
             else:
+                self._weight = None
                 self.items[letter] = Item(
                     text=text,
                     letter=letter,
@@ -67,7 +89,11 @@ class Inventory:
 
         unused_keys = old_keys.difference(new_keys)
         for key in unused_keys:
+            self._weight = None
             del self.items[key]
+            del self._rows[key]
+
+        self._buffers = buffers
 
     def __getitem__(self, key) -> List[Item]:
         category = self.inventory_categories[key]
@@ -144,8 +170,17 @@ class Inventory:
         return self.worn_armor_by_type[ArmorClass.SHIRT]
 
     @property
-    def weight(self):
-        return sum([item.weight for item in self.items.values()])
+    def weight(self) -> int:
+        if self._weight is None:
+            self._weight = sum([item.weight for item in self.items.values()])
+        return self._weight
+
+    @property
+    def can_squeeze(self) -> bool:
+        """
+        Whether we are light enough to move diagonally between tight gaps.
+        """
+        return self.weight < SQUEEZE_WEIGHT
 
 
 if __name__ == "__main__":
@@ -1,4 +1,7 @@
+import functools
 import re
+from types import MappingProxyType
+from typing import Dict
 
 import inflect
 
@@ -15,6 +18,38 @@ from nle_code_wrapper.bot.inventory.properties import (
 
 p = inflect.engine()
 
+# number of distinct item texts whose parses are kept, shared by all parsers
+PARSE_CACHE_SIZE = 4096
+
+
+# the parts of an item text, compiled once for all parsers
+ITEM_PATTERN = re.compile(
+    # Core item properties
+    r"^(?P<quantity>a|an|the|\d+)"
+    r"(?P<empty> empty)?"
+    r"(?:\s+(?P<beatitude>cursed|uncursed|blessed))?"
+    # Erosion conditions
+    r"(?P<erosion>(?:\s+"  # Start with space if there's a match
+    r"(?:(?:very|thoroughly)\s+)?"  # Intensity modifiers
+    r"(?:rusty|corroded|burnt|rotted)"
+    r")*)"
+    # Other conditions
+    r"(?P<other_condition>(?:\s+"  # Start with space if there's a match
+    r"(?:rustproof|poisoned|"
+    r"partly eaten|partly used|diluted|unlocked|locked|broken|wet|greased)"
+    r")*)"
+    # Item details
+    r"(?:\s+(?P<enchantment>[+-]\d+))?"  # Space before enchantment
+    r"\s+(?P<name>[a-zA-Z0-9-!'# ]+)"  # Required space before name
+    # Optional information
+    r"(?:\s+\((?P<uses>[0-9]+:[0-9]+|no charge)\))?"
+    r"(?:\s+\((?P<info>[a-zA-Z0-9; ]+(?:,\s+(?:flickering|gleaming|glimmering))?[a-zA-Z0-9; ]*)\))?"
+    # Shop information
+    r"(?:\s+\((?P<shop_status>for sale|unpaid),\s+"  # Matches shop status
+    r"(?:\d+\s+aum,\s+)?(?P<shop_price>\d+)\s+[^)]*\)?)?"  # Matches shop price; [^)]*\)? handles truncated inv strings (NLE caps inv_strs at 80 chars)
+    r"$"
+)
+
 
 class ItemParser:
     # Constants
@@ -52,41 +87,37 @@ class ItemParser:
         "alternate weapon; notwielded": (False, False),
     }
 
-    def __init__(self):
-        self.item_pattern = self._compile_item_pattern()
-
-    def _compile_item_pattern(self):
-        item_pattern = (
-            # Core item properties
-            r"^(?P<quantity>a|an|the|\d+)"
-            r"(?P<empty> empty)?"
-            r"(?:\s+(?P<beatitude>cursed|uncursed|blessed))?"
-            # Erosion conditions
-            r"(?P<erosion>(?:\s+"  # Start with space if there's a match
-            r"(?:(?:very|thoroughly)\s+)?"  # Intensity modifiers
-            r"(?:rusty|corroded|burnt|rotted)"
-            r")*)"
-            # Other conditions
-            r"(?P<other_condition>(?:\s+"  # Start with space if there's a match
-            r"(?:rustproof|poisoned|"
-            r"partly eaten|partly used|diluted|unlocked|locked|broken|wet|greased)"
-            r")*)"
-            # Item details
-            r"(?:\s+(?P<enchantment>[+-]\d+))?"  # Space before enchantment
-            r"\s+(?P<name>[a-zA-Z0-9-!'# ]+)"  # Required space before name
-            # Optional information
-            r"(?:\s+\((?P<uses>[0-9]+:[0-9]+|no charge)\))?"
-            r"(?:\s+\((?P<info>[a-zA-Z0-9; ]+(?:,\s+(?:flickering|gleaming|glimmering))?[a-zA-Z0-9; ]*)\))?"
-            # Shop information
-            r"(?:\s+\((?P<shop_status>for sale|unpaid),\s+"  # Matches shop status
-            r"(?:\d+\s+aum,\s+)?(?P<shop_price>\d+)\s+[^)]*\)?)?"  # Matches shop price; [^)]*\)? handles truncated inv strings (NLE caps inv_strs at 80 chars)
-            r"$"
-        )
+    def __call__(self, text):
+        """
+        Parses the item text. The results are cached for all parsers in the process and are shared, the mapping
+        is read-only and the properties in it are immutable, use `parse` for a result of your own.
+        """
+        return _parse_cached(text)
+
+    @staticmethod
+    def cache_info() -> Dict:
+        """
+        Statistics of the parse cache.
+        """
+        info = _parse_cached.cache_info()
+        calls = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / calls if calls else 0.0,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+        }
 
-        return re.compile(item_pattern)
+    @staticmethod
+    def cache_clear() -> None:
+        _parse_cached.cache_clear()
 
-    def __call__(self, text):
-        matches = re.match(self.item_pattern, text)
+    def parse(self, text):
+        """
+        Parses the item text without the cache.
+        """
+        matches = ITEM_PATTERN.match(text)
         if not matches:
             return None
 
@@ -298,6 +329,17 @@ class ItemParser:
         parsed_item["name"] = self._convert_from_japanese(parsed_item["name"])
 
 
+_parser = ItemParser()
+
+
+@functools.lru_cache(PARSE_CACHE_SIZE)
+def _parse_cached(text):
+    parsed_item = _parser.parse(text)
+    if parsed_item is None:
+        return None
+    return MappingProxyType(parsed_item)
+
+
 if __name__ == "__main__":
     parser = ItemParser()
     item = parser("a blessed +1 sword (being worn)")
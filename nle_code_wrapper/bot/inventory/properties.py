@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import enum
 import re
+from dataclasses import dataclass
 
 from nle import nethack as nh
 
@@ -119,10 +120,11 @@ class GemClass(enum.Enum):
         return self.name.lower()
 
 
+# parsed properties are shared between the items parsed from the same text, see `ItemParser`, so they are frozen
+@dataclass(frozen=True, eq=False)
 class ItemQuantity:
-    def __init__(self, value: int, repr: str):
-        self.value = value
-        self.repr = repr
+    value: int
+    repr: str
 
     def __eq__(self, other) -> bool:
         if isinstance(other, ItemQuantity):
@@ -156,10 +158,10 @@ class ItemBeatitude(enum.Enum):
                 return self.name.lower()
 
 
+@dataclass(frozen=True, eq=False)
 class ItemEnchantment:
-    def __init__(self, value: int = None, unknown: bool = False):
-        self.value = value
-        self.unknown = unknown
+    value: int = None
+    unknown: bool = False
 
     def __eq__(self, other: ItemEnchantment) -> bool:
         if isinstance(other, ItemEnchantment):
@@ -234,9 +236,9 @@ class ShopStatus(enum.Enum):
                 return "unpaid"
 
 
+@dataclass(frozen=True, eq=False)
 class ShopPrice:
-    def __init__(self, value: int):
-        self.value = value
+    value: int
 
     @classmethod
     def from_str(cls, str: str):
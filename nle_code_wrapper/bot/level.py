@@ -1,13 +1,15 @@
-from collections import defaultdict
-from typing import Any, List, Tuple, Union
+from collections import defaultdict, deque, namedtuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numba as nb
 import numpy as np
 from nle import nethack
 from nle_utils.blstats import BLStats
-from nle_utils.glyph import SS, C, G
+from nle_utils.glyph import C
 from numpy import int64, ndarray
 
 from nle_code_wrapper.utils import utils
+from nle_code_wrapper.utils.glyph_categories import CATEGORY_TABLE, GC
 
 
 class SafeAccess:
@@ -21,6 +23,134 @@ class SafeAccess:
             return False
 
 
+# categories of the glyphs `Level.update` looks at, in the order `_update_kernel` expects them
+_UPDATE_CATEGORIES = np.array(
+    [
+        # engulfed, the level is hidden
+        GC.SWALLOW,
+        # walkable terrain
+        GC.FLOOR | GC.STAIR_UP | GC.STAIR_DOWN | GC.DOOR_OPENED | GC.TRAPS | GC.ALTAR | GC.FOUNTAIN | GC.SINK,
+        # things which stand on walkable positions, the terrain below stays remembered
+        GC.MONS | GC.PETS | GC.BODIES | GC.OBJECTS | GC.STATUES,
+        # not walkable
+        GC.WALL | GC.DOOR_CLOSED | GC.BARS | GC.BOULDER | GC.LAVA | GC.WATER,
+        GC.DOORS,
+        GC.TRAPS,
+        # terrain features, see `Bot.get_terrain_features`
+        GC.STAIR_DOWN | GC.STAIR_UP | GC.ALTAR | GC.FOUNTAIN | GC.THRONE | GC.SINK | GC.GRAVE | GC.TRAPS,
+        GC.DOOR_CLOSED,
+    ],
+    np.uint32,
+)
+
+
+@nb.njit("b1(b1[:,:],b1[:,:],b1[:,:],i8,i8)", cache=True)
+def _is_frontier(walkable, seen, was_on, y, x):
+    if not seen[y, x] or not walkable[y, x] or was_on[y, x]:
+        return False
+    for ny in range(max(0, y - 1), min(seen.shape[0], y + 2)):
+        for nx in range(max(0, x - 1), min(seen.shape[1], x + 2)):
+            if not seen[ny, nx]:
+                return True
+    return False
+
+
+@nb.njit(
+    "Tuple((b1[:,:],b1[:,:],b1,b1))"
+    "(i2[:,:],u4[:],u4[:],b1[:,:],b1[:,:],i2[:,:],b1[:,:],i2[:,:],i2[:,:],b1[:,:],b1[:,:],i8,i8)",
+    cache=True,
+)
+def _update_kernel(
+    glyphs, table, categories, walkable, seen, objects, doors, known_traps, features, was_on, frontier, y, x
+):
+    swallow, terrain, standing, blocking, door, trap, feature, door_closed = categories
+    changed = np.zeros(glyphs.shape, dtype=nb.b1)
+    discovered = np.zeros(glyphs.shape, dtype=nb.b1)
+    # cells whose seen or walkable changed, the frontier is updated around them
+    touched = np.zeros(glyphs.shape, dtype=nb.b1)
+
+    for i in range(glyphs.shape[0]):
+        for j in range(glyphs.shape[1]):
+            glyph = glyphs[i, j]
+            if 0 <= glyph < table.shape[0] and table[glyph] & swallow:
+                return changed, discovered, False, False
+
+    walkable_changed = False
+    features_changed = False
+    for i in range(glyphs.shape[0]):
+        for j in range(glyphs.shape[1]):
+            glyph = glyphs[i, j]
+            if glyph < 0 or glyph >= table.shape[0] or table[glyph] == 0:
+                continue
+            category = table[glyph]
+            old_walkable, old_seen, old_object, old_door = walkable[i, j], seen[i, j], objects[i, j], doors[i, j]
+
+            if category & terrain:
+                walkable[i, j] = True
+                seen[i, j] = True
+                objects[i, j] = glyph
+
+            if category & standing:
+                seen[i, j] = True
+                walkable[i, j] = True
+                remembered = objects[i, j]
+                if 0 <= remembered < table.shape[0] and table[remembered] & door_closed:
+                    objects[i, j] = glyph + 2  # from closed to opened doors
+
+            if category & blocking:
+                seen[i, j] = True
+                objects[i, j] = glyph
+                walkable[i, j] = False
+
+            if category & door:
+                doors[i, j] = True
+
+            if category & trap:
+                known_traps[i, j] = glyph
+
+            if category & feature and features[i, j] != glyph:
+                features[i, j] = glyph
+                features_changed = True
+
+            if walkable[i, j] != old_walkable:
+                walkable_changed = True
+                changed[i, j] = True
+            elif objects[i, j] != old_object or doors[i, j] != old_door:
+                changed[i, j] = True
+            if walkable[i, j] != old_walkable or seen[i, j] != old_seen:
+                touched[i, j] = True
+            if seen[i, j] and not old_seen:
+                discovered[i, j] = True
+
+    was_on[y, x] = True
+    touched[y, x] = True
+
+    for i in range(glyphs.shape[0]):
+        for j in range(glyphs.shape[1]):
+            if not touched[i, j]:
+                continue
+            for ni in range(max(0, i - 1), min(glyphs.shape[0], i + 2)):
+                for nj in range(max(0, j - 1), min(glyphs.shape[1], j + 2)):
+                    frontier[ni, nj] = _is_frontier(walkable, seen, was_on, ni, nj)
+
+    return changed, discovered, walkable_changed, features_changed
+
+
+# result of `Level.update`, cells where walkable, objects or doors changed, cells we saw for the first time,
+# whether the walkability of any cell changed and whether the terrain features changed
+LevelUpdate = namedtuple("LevelUpdate", ["changed", "discovered", "walkable_changed", "features_changed"])
+
+# something we saw (or a position we visited) for the first time on the level, see `Level.discoveries`
+Discovery = namedtuple("Discovery", ["kind", "position"])
+
+# kinds of discoveries of the newly seen cells, a cell can be discovered as more kinds
+DISCOVERY_CATEGORIES = {
+    "door": GC.DOOR_CLOSED,
+    "item": GC.ITEMS,
+    "special": GC.THRONE | GC.GRAVE | GC.STAIR_DOWN | GC.STAIR_UP | GC.ALTAR | GC.FOUNTAIN | GC.SINK,
+}
+
+
 class Level:
     """
     Level class to store information about the current level.
@@ -38,6 +168,8 @@ class Level:
         self.objects[:] = -1
         self.doors = np.zeros((C.SIZE_Y, C.SIZE_X), bool)
         self.was_on = np.zeros((C.SIZE_Y, C.SIZE_X), bool)
+        # walkable positions we weren't on, next to positions we haven't seen, maintained by `update`
+        self.frontier = np.zeros((C.SIZE_Y, C.SIZE_X), bool)
         self.known_traps = np.zeros((C.SIZE_Y, C.SIZE_X), np.int16)
         self.known_traps[:] = -1
         self.features = np.zeros((C.SIZE_Y, C.SIZE_X), np.int16)
@@ -46,50 +178,126 @@ class Level:
         self.search_count = np.zeros((C.SIZE_Y, C.SIZE_X), np.int32)
         self.door_open_count = np.zeros((C.SIZE_Y, C.SIZE_X), np.int32)
 
+        # extra costs of entering cells, e.g. shops we should not enter, see `set_penalty`
+        self.penalties: Dict[str, ndarray] = {}
+
+        # incremented every time walkable, objects, doors or penalties change,
+        # together with the cells which changed, used to invalidate caches
+        self.version = 0
+        self.changes = deque(maxlen=64)
+
+        # labeled rooms and corridors, see `label_dungeon_features`
+        self.dungeon_features = None
+
+        # discoveries in the order they happened, appended by `update`, consumers keep their own position in the list
+        self.discoveries: List[Discovery] = []
+
     def key(self):
         return (self.dungeon_number, self.level_number)
 
-    def update(self, glyphs: ndarray, blstats: BLStats) -> None:
+    def update(self, glyphs: ndarray, blstats: BLStats) -> LevelUpdate:
         """
         Update the level with the new glyphs and blstats.
-        """
-        if utils.isin(glyphs, G.SWALLOW).any():
-            return
 
-        mask = utils.isin(
-            glyphs, G.FLOOR, G.STAIR_UP, G.STAIR_DOWN, G.DOOR_OPENED, G.TRAPS, G.ALTAR, G.FOUNTAIN, G.SINK
+        Returns:
+            LevelUpdate: what changed, nothing changes while we are engulfed
+        """
+        visited = not self.was_on[blstats.y, blstats.x]
+        changed, discovered, walkable_changed, features_changed = _update_kernel(
+            glyphs,
+            CATEGORY_TABLE,
+            _UPDATE_CATEGORIES,
+            self.walkable,
+            self.seen,
+            self.objects,
+            self.doors,
+            self.known_traps,
+            self.features,
+            self.was_on,
+            self.frontier,
+            blstats.y,
+            blstats.x,
         )
-        self.walkable[mask] = True
-        self.seen[mask] = True
-        self.objects[mask] = glyphs[mask]
-
-        mask = utils.isin(glyphs, G.MONS, G.PETS, G.BODIES, G.OBJECTS, G.STATUES)
-        self.seen[mask] = True
-        self.walkable[mask] = True
-        doors_closed_mask = utils.isin(self.objects, G.DOOR_CLOSED)
-        self.objects[doors_closed_mask & mask] = glyphs[doors_closed_mask & mask] + 2  # from closed to opened doors
-
-        mask = utils.isin(glyphs, G.WALL, G.DOOR_CLOSED, G.BARS, G.BOULDER, frozenset({SS.S_lava, SS.S_water}))
-        self.seen[mask] = True
-        self.objects[mask] = glyphs[mask]
-        self.walkable[mask] = False
-
-        # TODO: it would be nice if we would change this to False when doors are destroyed
-        # how to detect that doors were destroyed
-        mask = utils.isin(glyphs, G.DOORS)
-        self.doors[mask] = True
-
-        mask = utils.isin(glyphs, G.TRAPS)
-        self.known_traps[mask] = glyphs[mask]
-        self.was_on[blstats.y, blstats.x] = True
-
-        mask = utils.isin(glyphs, G.STAIR_DOWN, G.STAIR_UP, G.ALTAR, G.FOUNTAIN, G.THRONE, G.SINK, G.GRAVE, G.TRAPS)
-        if not np.all(self.features[mask] == glyphs[mask]):
-            self.features[mask] = glyphs[mask]
-            # means that we need to update terrain features
-            return True
-        else:
-            return False
+        self._record_change(changed)
+
+        for position in map(tuple, np.argwhere(discovered)):
+            category = CATEGORY_TABLE[glyphs[position]]
+            for kind, kind_category in DISCOVERY_CATEGORIES.items():
+                if category & kind_category:
+                    self.discoveries.append(Discovery(kind, position))
+        if visited and self.was_on[blstats.y, blstats.x]:
+            self.discoveries.append(Discovery("visited", (blstats.y, blstats.x)))
+
+        return LevelUpdate(changed, discovered, walkable_changed, features_changed)
+
+    def _record_change(self, changed: ndarray) -> None:
+        if changed.any():
+            self.version += 1
+            self.changes.append((self.version, changed))
+
+    def changed_since(self, version: int) -> Optional[ndarray]:
+        """
+        Cells where walkable, objects, doors or penalties changed after the given version.
+
+        Returns:
+            Optional[ndarray]: boolean mask of the changed cells, None if the version is too old to be tracked
+        """
+        changed = np.zeros((C.SIZE_Y, C.SIZE_X), bool)
+        if version == self.version:
+            return changed
+
+        if not self.changes or self.changes[0][0] > version + 1:
+            return None
+
+        for change_version, mask in self.changes:
+            if change_version > version:
+                changed |= mask
+        return changed
 
     def object_coords(self, obj: frozenset) -> List[Union[Any, Tuple[int64, int64]]]:
         return utils.coords(self.objects, obj)
+
+    def set_penalty(self, name: str, costs: ndarray) -> None:
+        """
+        Adds (or replaces) a named layer of costs of entering the cells, zero means no penalty.
+        Pathfinding takes the highest cost of all layers.
+
+        Args:
+            name (str): Name of the layer.
+            costs (ndarray): Array of the level shape with the cost of entering each cell.
+        """
+        old = self.penalties.get(name, 0)
+        self.penalties[name] = np.asarray(costs, np.int32)
+        self._record_change(np.broadcast_to(old != self.penalties[name], self.walkable.shape).copy())
+
+    def remove_penalty(self, name: str) -> None:
+        old = self.penalties.pop(name, None)
+        if old is not None:
+            self._record_change(old != 0)
+
+    def cost_layer(self, layer: ndarray, costs: Dict[frozenset, int], window: Tuple[slice, slice]) -> ndarray:
+        """
+        Cost of entering each cell of the window based on the glyphs remembered in the layer
+        (``objects``, ``known_traps``...).
+
+        Args:
+            layer (ndarray): Glyphs of the level.
+            costs (Dict[frozenset, int]): Cost of entering the cells with the given glyphs.
+            window (Tuple[slice, slice]): Part of the level to compute.
+        Returns:
+            ndarray: int32 costs of the window, zero where none of the glyphs is present
+        """
+        ret = np.zeros(layer[window].shape, np.int32)
+        for glyphs, cost in costs.items():
+            mask = utils.isin(layer[window], glyphs)
+            ret[mask] = np.maximum(ret[mask], cost)
+        return ret
+
+    def penalty_costs(self, window: Tuple[slice, slice]) -> ndarray:
+        """
+        Highest of the penalties set with `set_penalty` for each cell of the window.
+        """
+        ret = np.zeros(self.walkable[window].shape, np.int32)
+        for costs in self.penalties.values():
+            np.maximum(ret, costs[window], out=ret)
+        return ret
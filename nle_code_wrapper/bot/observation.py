@@ -0,0 +1,138 @@
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from nle_utils.blstats import BLStats
+from numpy import int64, ndarray
+
+from nle_code_wrapper.bot.entity import Entity
+from nle_code_wrapper.utils.glyph_categories import GC, glyph_categories, is_category
+
+
+class ObservationBuffer:
+    """
+    Copies of the previous observations without allocating on every step.
+
+    NLE updates the observation arrays in place, so to keep the last observation around every array has to be
+    copied. They are copied with `np.copyto` into two preallocated slots used in turns, a snapshot stays valid until
+    the next but one snapshot is taken. Copy it (e.g. `copy.deepcopy`) to keep it longer.
+    """
+
+    def __init__(self, keys: Optional[Sequence[str]] = None) -> None:
+        # None copies every array of the observation
+        self.keys = None if keys is None else tuple(keys)
+        self.slots: List[Optional[Dict[str, np.ndarray]]] = [None, None]
+        self.index = 0
+
+    def snapshot(self, obs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns a shallow copy of obs where the arrays with the buffered keys are copied into the next slot.
+        """
+        keys = self.keys
+        if keys is None:
+            keys = tuple(key for key, value in obs.items() if isinstance(value, np.ndarray))
+
+        slot = self.slots[self.index]
+        if (
+            slot is None
+            or slot.keys() != set(keys)
+            or any(buffer.shape != obs[key].shape for key, buffer in slot.items())
+        ):
+            slot = {key: np.array(obs[key]) for key in keys}
+            self.slots[self.index] = slot
+        else:
+            for key, buffer in slot.items():
+                np.copyto(buffer, obs[key])
+        self.index ^= 1
+
+        snapshot = dict(obs)
+        snapshot.update(slot)
+        return snapshot
+
+
+class StepView:
+    """
+    Fields derived from a single observation, every one of them is computed on first access and only once.
+    """
+
+    def __init__(self, obs: Dict[str, Any]) -> None:
+        self.obs = obs
+
+    def carry(self, obs: Dict[str, Any]) -> "StepView":
+        """
+        View of a snapshot of our observation (see `ObservationBuffer`) which keeps the fields computed so far.
+        The fields have to be computed from the same arrays as the snapshot, views of observations which are
+        updated in place (e.g. by `Bot.internal_step`) are replaced instead of carried.
+        """
+        view = StepView(obs)
+        view.__dict__.update({key: value for key, value in self.__dict__.items() if key != "obs"})
+        return view
+
+    @property
+    def glyphs(self) -> ndarray:
+        return self.obs["glyphs"]
+
+    @cached_property
+    def blstats(self) -> BLStats:
+        return BLStats(*self.obs["blstats"])
+
+    @cached_property
+    def entity(self) -> Entity:
+        """
+        The player.
+        """
+        position = (self.blstats.y, self.blstats.x)
+        return Entity(position, self.glyphs[position])
+
+    @cached_property
+    def categories(self) -> ndarray:
+        """
+        Categories of the glyphs, see `glyph_categories`.
+        """
+        return glyph_categories(self.glyphs)
+
+    @cached_property
+    def monster_mask(self) -> ndarray:
+        mask = is_category(self.categories, GC.MONS | GC.INVISIBLE_MON)
+        mask[self.blstats.y, self.blstats.x] = 0
+        return mask
+
+    @cached_property
+    def entities(self) -> List[Entity]:
+        """
+        The monsters, without the player.
+        """
+        return [Entity(position, self.glyphs[position]) for position in list(zip(*np.where(self.monster_mask)))]
+
+    @cached_property
+    def level_key(self) -> Tuple[int64, int64]:
+        return (self.blstats.dungeon_number, self.blstats.level_number)
+
+
+class ObservationChanges:
+    """
+    Tracks which observation fields changed since a subsystem last looked at them, e.g. the glyphs stay the same
+    while we navigate menus or type text, and the level doesn't have to be updated.
+    """
+
+    def __init__(self) -> None:
+        self.seen: Dict[str, Dict[str, ndarray]] = {}
+
+    def changed(self, name: str, obs: Dict[str, Any], keys: Sequence[str]) -> bool:
+        """
+        Whether any of the keys of obs changed since the last call with the same name which returned True.
+        The first call for every name returns True.
+        """
+        seen = self.seen.get(name)
+        if seen is not None and all(np.array_equal(seen[key], obs[key]) for key in keys):
+            return False
+
+        if seen is None or any(seen[key].shape != obs[key].shape for key in keys):
+            self.seen[name] = {key: np.array(obs[key]) for key in keys}
+        else:
+            for key in keys:
+                np.copyto(seen[key], obs[key])
+        return True
+
+    def reset(self) -> None:
+        self.seen.clear()
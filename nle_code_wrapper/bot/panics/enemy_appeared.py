@@ -13,17 +13,14 @@ def enemy_appeared(bot: "Bot"):
     last_entities = defaultdict(int)
     current_entities = defaultdict(int)
 
-    # Count entities from current observation
-    for entity in bot.entities:
-        if bot.pathfinder.reachable(bot.entity.position, entity.position, adjacent=True):
-            if not MonsterClassTypes.always_peaceful(entity.name):
-                current_entities[entity.glyph] += 1
-
-    # Count entities from previous observation
-    for entity in bot.get_entities(bot.last_obs):
-        if bot.pathfinder.reachable(bot.entity.position, entity.position, adjacent=True):
-            if not MonsterClassTypes.always_peaceful(entity.name):
-                last_entities[entity.glyph] += 1
+    # Count entities from current and previous observation
+    for entities, counts in [(bot.entities, current_entities), (bot.get_entities(bot.last_obs), last_entities)]:
+        _, distances = bot.pathfinder.reachable_many(
+            bot.entity.position, [entity.position for entity in entities], adjacent=True
+        )
+        for entity, distance in zip(entities, distances):
+            if distance >= 0 and not MonsterClassTypes.always_peaceful(entity.name):
+                counts[entity.glyph] += 1
 
     bot.movements.monster_collision = monster_collistion
 
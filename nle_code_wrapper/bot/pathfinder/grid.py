@@ -0,0 +1,629 @@
+import heapq
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import networkx as nx
+import numba as nb
+import numpy as np
+from numpy import int64, ndarray
+
+from nle_code_wrapper.bot.pathfinder.distance import chebyshev_distance
+
+# bit ``i`` of a move mask corresponds to ``DIRECTIONS[i]``,
+# cardinal directions first, same order as ``Movements.neighbors``
+DIRECTIONS = np.array(
+    [
+        (-1, 0),
+        (1, 0),
+        (0, -1),
+        (0, 1),
+        (-1, -1),
+        (-1, 1),
+        (1, -1),
+        (1, 1),
+    ],
+    dtype=np.int64,
+)
+CARDINAL_BITS = 0b00001111
+INTERMEDIATE_BITS = 0b11110000
+
+_DY = DIRECTIONS[:, 0].copy()
+_DX = DIRECTIONS[:, 1].copy()
+_BITS = {(int(dy), int(dx)): bit for bit, (dy, dx) in enumerate(DIRECTIONS)}
+# bit of the opposite direction
+_REVERSE = np.array([_BITS[(-int(dy), -int(dx))] for dy, dx in DIRECTIONS], dtype=np.int64)
+
+
+def shift(array: ndarray, dy: int, dx: int, fill=False) -> ndarray:
+    """
+    Returns ``out`` such that ``out[y, x] == array[y + dy, x + dx]``, cells outside of the array are ``fill``.
+    """
+    height, width = array.shape
+    out = np.full_like(array, fill)
+    out[max(0, -dy) : min(height, height - dy), max(0, -dx) : min(width, width - dx)] = array[
+        max(0, dy) : min(height, height + dy), max(0, dx) : min(width, width + dx)
+    ]
+    return out
+
+
+Window = Tuple[slice, slice]
+
+
+def bounding_window(mask: ndarray, margin: int = 0) -> Optional[Window]:
+    """
+    Smallest window containing all True cells of the mask, grown by margin and clipped to the array.
+    None if the mask is empty.
+    """
+    ys, xs = np.nonzero(mask)
+    if len(ys) == 0:
+        return None
+
+    height, width = mask.shape
+    return (
+        slice(max(0, ys.min() - margin), min(height, ys.max() + margin + 1)),
+        slice(max(0, xs.min() - margin), min(width, xs.max() + margin + 1)),
+    )
+
+
+def grow_window(window: Window, margin: int, shape: Tuple[int, int]) -> Tuple[Window, Window]:
+    """
+    Grows the window by margin (clipped to shape).
+
+    Returns:
+        Tuple[Window, Window]: the grown window and the original window relative to the grown one
+    """
+    outer = tuple(slice(max(0, w.start - margin), min(size, w.stop + margin)) for w, size in zip(window, shape))
+    inner = tuple(slice(w.start - o.start, w.stop - o.start) for w, o in zip(window, outer))
+    return outer, inner
+
+
+def window_position(pos: Tuple[int64, int64], window: Window) -> Optional[Tuple[int, int]]:
+    """
+    Position relative to the window, None if it lies outside of the window.
+    """
+    y, x = pos[0] - window[0].start, pos[1] - window[1].start
+    if 0 <= y < window[0].stop - window[0].start and 0 <= x < window[1].stop - window[1].start:
+        return (int(y), int(x))
+    return None
+
+
+def goal_mask(goals: Union[ndarray, Iterable[Tuple[int64, int64]]], shape: Tuple[int, int]) -> ndarray:
+    """
+    Boolean mask of the goals, which are either already a boolean mask or positions (out of bounds ones are skipped).
+    """
+    if isinstance(goals, ndarray) and goals.dtype == bool and goals.shape == shape:
+        return goals
+
+    mask = np.zeros(shape, bool)
+    positions = np.array(list(goals), dtype=np.int64).reshape(-1, 2)
+    inside = (positions >= 0).all(axis=1) & (positions[:, 0] < shape[0]) & (positions[:, 1] < shape[1])
+    mask[positions[inside, 0], positions[inside, 1]] = True
+    return mask
+
+
+def build_move_mask(passable: ndarray, diagonal_blocked: ndarray, diagonal: bool = True) -> ndarray:
+    """
+    Builds a uint8 array where each bit of ``mask[y, x]`` tells if we can move from (y, x) in the direction
+    ``DIRECTIONS[bit]``.
+
+    Args:
+        passable (ndarray): Boolean array of the cells we can enter.
+        diagonal_blocked (ndarray): Boolean array of the cells we cannot enter or leave diagonally (doors, boulders).
+        diagonal (bool): Whether diagonal movements are allowed at all.
+    Returns:
+        ndarray: uint8 move mask of the same shape as ``passable``.
+    """
+    mask = np.zeros(passable.shape, np.uint8)
+    for bit, (dy, dx) in enumerate(DIRECTIONS):
+        if bit >= 4:
+            if not diagonal:
+                break
+            allowed = shift(passable & ~diagonal_blocked, dy, dx) & ~diagonal_blocked
+        else:
+            allowed = shift(passable, dy, dx)
+        mask |= allowed.astype(np.uint8) << bit
+    return mask
+
+
+@nb.njit("Tuple((i4[:,:],i4[:,:]))(u1[:,:],i8,i8)", cache=True)
+def bfs(moves, start_y, start_x):
+    """
+    Unweighted breadth first search over the move mask. Returns the number of steps and
+    the flat index of the predecessor of every cell, -1 for the unreachable ones.
+    """
+    height, width = moves.shape
+    dist = np.full((height, width), -1, dtype=np.int32)
+    pred = np.full((height, width), -1, dtype=np.int32)
+    queue = np.empty(height * width, dtype=np.int32)
+
+    dist[start_y, start_x] = 0
+    queue[0] = start_y * width + start_x
+    head, tail = 0, 1
+    while head < tail:
+        idx = queue[head]
+        head += 1
+        y, x = idx // width, idx % width
+        for d in range(8):
+            if moves[y, x] & (1 << d):
+                ny, nx_ = y + _DY[d], x + _DX[d]
+                if dist[ny, nx_] < 0:
+                    dist[ny, nx_] = dist[y, x] + 1
+                    pred[ny, nx_] = idx
+                    queue[tail] = ny * width + nx_
+                    tail += 1
+    return dist, pred
+
+
+@nb.njit("Tuple((i8[:,:],i4[:,:],i8))(u1[:,:],i4[:,:],i8,i8,b1[:,:])", cache=True)
+def dijkstra(moves, costs, start_y, start_x, goals):
+    """
+    Dijkstra over the move mask where entering cell (y, x) costs ``costs[y, x]``.
+    Stops as soon as the first goal is settled, pass an empty goal mask to search the whole graph.
+    Returns distances (-1 for unreached cells), predecessors and the flat index of the settled goal (-1 if none).
+    """
+    height, width = moves.shape
+    dist = np.full((height, width), -1, dtype=np.int64)
+    pred = np.full((height, width), -1, dtype=np.int32)
+    done = np.zeros((height, width), dtype=np.bool_)
+
+    dist[start_y, start_x] = 0
+    heap = [(np.int64(0), np.int64(start_y * width + start_x))]
+    while len(heap) > 0:
+        d, idx = heapq.heappop(heap)
+        y, x = idx // width, idx % width
+        if done[y, x]:
+            continue
+        done[y, x] = True
+        if goals[y, x]:
+            return dist, pred, idx
+        for k in range(8):
+            if moves[y, x] & (1 << k):
+                ny, nx_ = y + _DY[k], x + _DX[k]
+                nd = d + costs[ny, nx_]
+                if not done[ny, nx_] and (dist[ny, nx_] < 0 or nd < dist[ny, nx_]):
+                    dist[ny, nx_] = nd
+                    pred[ny, nx_] = idx
+                    heapq.heappush(heap, (nd, np.int64(ny * width + nx_)))
+    return dist, pred, np.int64(-1)
+
+
+@nb.njit("Tuple((i4[:,:],b1))(u1[:,:],i4[:,:],i4[:,:],i8,i8,i8,i8,i8,i8)", cache=True)
+def astar(moves, costs, heuristic, start_y, start_x, goal_y, goal_x, max_expansions, max_cost):
+    """
+    A* over the move mask, ``heuristic`` has to be a lower bound of the cost to the goal from every cell.
+    The search gives up after ``max_expansions`` settled cells or once every open path costs more than ``max_cost``
+    (non positive ``max_expansions`` and negative ``max_cost`` mean unbounded).
+    Returns predecessors and whether the goal was reached.
+    """
+    height, width = moves.shape
+    dist = np.full((height, width), -1, dtype=np.int64)
+    pred = np.full((height, width), -1, dtype=np.int32)
+    done = np.zeros((height, width), dtype=np.bool_)
+
+    dist[start_y, start_x] = 0
+    h = np.int64(heuristic[start_y, start_x])
+    # ties are broken towards cells closer to the goal
+    heap = [(h, h, np.int64(start_y * width + start_x))]
+    expansions = 0
+    while len(heap) > 0:
+        f, _, idx = heapq.heappop(heap)
+        y, x = idx // width, idx % width
+        if done[y, x]:
+            continue
+        if y == goal_y and x == goal_x:
+            return pred, True
+        if max_cost >= 0 and f > max_cost:
+            break
+        if max_expansions > 0 and expansions >= max_expansions:
+            break
+        done[y, x] = True
+        expansions += 1
+        d = dist[y, x]
+        for k in range(8):
+            if moves[y, x] & (1 << k):
+                ny, nx_ = y + _DY[k], x + _DX[k]
+                nd = d + costs[ny, nx_]
+                if not done[ny, nx_] and (dist[ny, nx_] < 0 or nd < dist[ny, nx_]):
+                    dist[ny, nx_] = nd
+                    pred[ny, nx_] = idx
+                    h = np.int64(heuristic[ny, nx_])
+                    heapq.heappush(heap, (nd + h, h, np.int64(ny * width + nx_)))
+    return pred, False
+
+
+@nb.njit("b1[:,:](u1[:,:],b1[:,:],i8,i8)", cache=True)
+def articulation_points(moves, component, start_y, start_x):
+    """
+    Articulation points of the undirected version of the move mask restricted to the component,
+    positions whose removal disconnects the component. Iterative Tarjan's algorithm started from (start_y, start_x).
+    """
+    height, width = moves.shape
+    size = height * width
+    disc = np.full(size, -1, dtype=np.int64)
+    low = np.zeros(size, dtype=np.int64)
+    parent = np.full(size, -1, dtype=np.int64)
+    stack = np.empty(size, dtype=np.int64)
+    next_dir = np.zeros(size, dtype=np.int64)
+    ret = np.zeros((height, width), dtype=np.bool_)
+
+    root = start_y * width + start_x
+    disc[root] = low[root] = 0
+    time, root_children = 1, 0
+    stack[0], top = root, 0
+    while top >= 0:
+        v = stack[top]
+        y, x = v // width, v % width
+        k = next_dir[v]
+        if k < 8:
+            next_dir[v] = k + 1
+            ny, nx_ = y + _DY[k], x + _DX[k]
+            if not (0 <= ny < height and 0 <= nx_ < width) or not component[ny, nx_]:
+                continue
+            if not (moves[y, x] >> k & 1 or moves[ny, nx_] >> _REVERSE[k] & 1):
+                continue
+            w = ny * width + nx_
+            if disc[w] < 0:
+                parent[w] = v
+                disc[w] = low[w] = time
+                time += 1
+                if v == root:
+                    root_children += 1
+                top += 1
+                stack[top] = w
+            elif w != parent[v]:
+                low[v] = min(low[v], disc[w])
+        else:
+            top -= 1
+            p = parent[v]
+            if p >= 0:
+                low[p] = min(low[p], low[v])
+                if p != root and low[v] >= disc[p]:
+                    ret[p // width, p % width] = True
+    if root_children > 1:
+        ret[start_y, start_x] = True
+    return ret
+
+
+@nb.njit("i8[:](u1[:,:],b1[:,:],b1[:,:],i8[:,:],i8)", cache=True)
+def approach_counts(moves, sources, adjacent, spots, directions):
+    """
+    For every spot, the number of positions next to it (the first ``directions`` of ``DIRECTIONS``, where
+    ``adjacent`` is set) which can be reached from the sources without passing through the spot.
+    """
+    height, width = moves.shape
+    counts = np.zeros(spots.shape[0], dtype=np.int64)
+    queue = np.empty(height * width, dtype=np.int64)
+    seen = np.zeros((height, width), dtype=np.bool_)
+    for i in range(spots.shape[0]):
+        sy, sx = spots[i, 0], spots[i, 1]
+        seen[:, :] = False
+        seen[sy, sx] = True
+        head, tail = 0, 0
+        for y in range(height):
+            for x in range(width):
+                if sources[y, x] and not seen[y, x]:
+                    seen[y, x] = True
+                    queue[tail] = y * width + x
+                    tail += 1
+        while head < tail:
+            idx = queue[head]
+            head += 1
+            y, x = idx // width, idx % width
+            for k in range(8):
+                if moves[y, x] & (1 << k):
+                    ny, nx_ = y + _DY[k], x + _DX[k]
+                    if not seen[ny, nx_]:
+                        seen[ny, nx_] = True
+                        queue[tail] = ny * width + nx_
+                        tail += 1
+        seen[sy, sx] = False
+        for k in range(directions):
+            ny, nx_ = sy + _DY[k], sx + _DX[k]
+            if 0 <= ny < height and 0 <= nx_ < width and adjacent[ny, nx_] and seen[ny, nx_]:
+                counts[i] += 1
+    return counts
+
+
+@nb.njit("i8[:,:](i4[:,:],i8,i8)", cache=True)
+def trace(pred, goal_y, goal_x):
+    """
+    Follows the predecessors back from the goal, returns the path from the start to the goal as (y, x) rows.
+    """
+    width = pred.shape[1]
+    length = 1
+    idx = pred[goal_y, goal_x]
+    while idx >= 0:
+        length += 1
+        idx = pred[idx // width, idx % width]
+
+    path = np.empty((length, 2), dtype=np.int64)
+    y, x = goal_y, goal_x
+    for i in range(length - 1, -1, -1):
+        path[i, 0] = y
+        path[i, 1] = x
+        idx = pred[y, x]
+        y, x = idx // width, idx % width
+    return path
+
+
+class DistanceField(Mapping):
+    """
+    Number of steps from ``start`` to every position reachable from it, computed with a single search.
+
+    Behaves like a ``{position: distance}`` dictionary (unreachable positions are missing),
+    the search result is kept as a dense int32 distance array and a predecessor array,
+    so paths, closest positions and reachability can be answered without searching again.
+    """
+
+    def __init__(self, start: Tuple[int64, int64], dist: ndarray, pred: ndarray) -> None:
+        self.start = start
+        self.dist = dist
+        self.pred = pred
+
+    @classmethod
+    def empty(cls, start: Tuple[int64, int64], shape: Tuple[int, int]) -> "DistanceField":
+        return cls(start, np.full(shape, -1, np.int32), np.full(shape, -1, np.int32))
+
+    def _index(self, pos) -> Optional[Tuple[int, int]]:
+        try:
+            y, x = pos
+        except (TypeError, ValueError):
+            return None
+        height, width = self.dist.shape
+        if 0 <= y < height and 0 <= x < width and self.dist[y, x] >= 0:
+            return (int(y), int(x))
+        return None
+
+    def __getitem__(self, pos: Tuple[int64, int64]) -> int:
+        index = self._index(pos)
+        if index is None:
+            raise KeyError(pos)
+        return int(self.dist[index])
+
+    def __contains__(self, pos) -> bool:
+        return self._index(pos) is not None
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        ys, xs = np.nonzero(self.dist >= 0)
+        return zip(ys.tolist(), xs.tolist())
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.dist >= 0))
+
+    @property
+    def reachable(self) -> ndarray:
+        """
+        Boolean mask of the positions reachable from start.
+        """
+        return self.dist >= 0
+
+    def path_to(self, goal: Tuple[int64, int64]) -> Union[List[Tuple[int, int]], None]:
+        """
+        Path with the least number of steps from start to goal (both included), None if goal is not reachable.
+        """
+        index = self._index(goal)
+        if index is None:
+            return None
+        return [tuple(p) for p in trace(self.pred, *index).tolist()]
+
+    def closest(self, positions: Iterable[Tuple[int64, int64]]) -> Union[Tuple[int64, int64], None]:
+        """
+        The closest reachable position from positions, first one wins ties. None if none of them is reachable.
+        """
+        positions = [tuple(pos) for pos in positions if pos is not None]
+        if not positions:
+            return None
+
+        ys, xs = np.array(positions, dtype=np.int64).reshape(-1, 2).T
+        height, width = self.dist.shape
+        inside = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+        dist = np.full(len(positions), -1, np.int64)
+        dist[inside] = self.dist[ys[inside], xs[inside]]
+        if not np.any(dist >= 0):
+            return None
+
+        dist[dist < 0] = np.iinfo(np.int64).max
+        return positions[int(np.argmin(dist))]
+
+    def closest_around(self, positions: ndarray, valid: ndarray) -> Tuple[ndarray, ndarray]:
+        """
+        For every position, the closest reachable position next to it, a batched version of `closest`.
+
+        Args:
+            positions (ndarray): (n, 2) positions
+            valid (ndarray): (n, 8) bool mask of the directions in ``DIRECTIONS`` to consider for every position
+        Returns:
+            Tuple[ndarray, ndarray]: (n, 2) closest positions and (n,) their distances, -1 where none is reachable.
+            The first direction wins ties.
+        """
+        around = positions.reshape(-1, 1, 2) + DIRECTIONS[None]
+        ys, xs = around[..., 0], around[..., 1]
+        height, width = self.dist.shape
+        valid = valid & (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+
+        unreachable = np.iinfo(np.int64).max
+        dist = np.full(valid.shape, unreachable, np.int64)
+        dist[valid] = self.dist[ys[valid], xs[valid]]
+        dist[dist < 0] = unreachable
+
+        rows = np.arange(len(dist))
+        best = np.argmin(dist, axis=1)
+        distances = dist[rows, best]
+        closest = around[rows, best]
+        closest[distances == unreachable] = -1
+        distances[distances == unreachable] = -1
+        return closest, distances
+
+
+class MovementGrid:
+    """
+    Array based movement graph of the current level.
+
+    ``moves[y, x]`` holds a bit for every direction in ``DIRECTIONS`` we can step to from (y, x),
+    ``costs[y, x]`` is the cost of entering (y, x). Same as the networkx movements graph,
+    only positions connected to ``origin`` (player position) are part of the graph.
+    """
+
+    def __init__(self, moves: ndarray, costs: ndarray, origin: Tuple[int64, int64]) -> None:
+        self.moves = moves
+        self.costs = costs.astype(np.int32)
+        self.origin = (int(origin[0]), int(origin[1]))
+        self.component = bfs(self.moves, *self.origin)[0] >= 0
+        # state of the level the grid was built for, see `Pathfinder.create_movements_grid`
+        self.state = None
+        # distance fields computed on this grid, keyed by their start
+        self.fields: Dict[Tuple[int, int], DistanceField] = {}
+        self._articulation_points: Optional[ndarray] = None
+
+    def update(self, window: Window, moves: ndarray, costs: ndarray, origin: Tuple[int64, int64]) -> None:
+        """
+        Replaces moves and costs inside the window and recomputes the positions connected to origin.
+        """
+        self.moves[window] = moves
+        self.costs[window] = costs
+        self.origin = (int(origin[0]), int(origin[1]))
+        self.component = bfs(self.moves, *self.origin)[0] >= 0
+        self.fields.clear()
+        self._articulation_points = None
+
+    def __contains__(self, pos: Tuple[int64, int64]) -> bool:
+        height, width = self.moves.shape
+        return 0 <= pos[0] < height and 0 <= pos[1] < width and bool(self.component[pos[0], pos[1]])
+
+    def articulation_points(self) -> ndarray:
+        """
+        Boolean mask of the choke points, positions whose removal disconnects the graph (moves in either direction
+        connect positions). The result is memoized until the grid changes.
+        """
+        if self._articulation_points is None:
+            self._articulation_points = articulation_points(self.moves, self.component, *self.origin)
+        return self._articulation_points
+
+    def approach_counts(
+        self,
+        spots: Iterable[Tuple[int64, int64]],
+        sources: Iterable[Tuple[int64, int64]],
+        adjacent: ndarray,
+        diagonal: bool = True,
+    ) -> ndarray:
+        """
+        For every spot, the number of adjacent positions which the sources (e.g. monsters) can reach
+        without passing through the spot, a single multi-source search per spot.
+
+        Args:
+            spots (Iterable[Tuple[int64, int64]]): Positions to evaluate.
+            sources (Iterable[Tuple[int64, int64]]): Start positions, the ones outside of the graph are ignored.
+            adjacent (ndarray): Boolean mask of the positions which count as adjacent (e.g. walkable).
+            diagonal (bool): Whether diagonal positions are adjacent.
+        Returns:
+            ndarray: int64 count for every spot.
+        """
+        spots = np.array([tuple(spot) for spot in spots], dtype=np.int64).reshape(-1, 2)
+        sources = goal_mask(sources, self.moves.shape) & self.component
+        return approach_counts(self.moves, sources, adjacent & self.component, spots, 8 if diagonal else 4)
+
+    def first_blocked(self, path: List[Tuple[int64, int64]], steps: Optional[int] = None) -> Optional[int]:
+        """
+        Index ``i`` of the first move ``path[i] -> path[i + 1]`` which is not possible anymore,
+        None if the first ``steps`` moves (all by default) are possible.
+        """
+        for i in range(len(path) - 1 if steps is None else min(steps, len(path) - 1)):
+            (y, x), (ny, nx_) = path[i], path[i + 1]
+            bit = _BITS.get((int(ny - y), int(nx_ - x)))
+            if bit is None or not self.moves[y, x] >> bit & 1:
+                return i
+        return None
+
+    def distances(self, start: Tuple[int64, int64]) -> DistanceField:
+        """
+        Number of steps from start to every position of the graph, empty if start is not in the graph.
+        The result is memoized until the grid changes.
+        """
+        key = (int(start[0]), int(start[1]))
+        if key not in self.fields:
+            if start in self:
+                self.fields[key] = DistanceField(start, *bfs(self.moves, *key))
+            else:
+                self.fields[key] = DistanceField.empty(start, self.moves.shape)
+        return self.fields[key]
+
+    def shortest_path(
+        self,
+        start: Tuple[int64, int64],
+        goal: Tuple[int64, int64],
+        max_expansions: Optional[int] = None,
+        max_cost: Optional[int] = None,
+    ) -> Union[List[Tuple[int, int]], None]:
+        """
+        Cheapest path from start to goal (both included) according to ``costs``, found with A*.
+
+        Every move costs at least 1, so the chebyshev distance to the goal is an admissible heuristic.
+
+        Args:
+            start (Tuple[int64, int64]): Start position.
+            goal (Tuple[int64, int64]): Goal position.
+            max_expansions (Optional[int]): Give up after settling this many cells.
+            max_cost (Optional[int]): Give up once the path is known to cost more than this.
+        Returns:
+            Union[List[Tuple[int, int]], None]: Path from start to goal, None if there is none within the bounds.
+        """
+        if start not in self or goal not in self:
+            return None
+
+        heuristic = chebyshev_distance(np.indices(self.moves.shape), np.reshape(goal, (2, 1, 1)), axis=0)
+        pred, found = astar(
+            self.moves,
+            self.costs,
+            heuristic.astype(np.int32),
+            int(start[0]),
+            int(start[1]),
+            int(goal[0]),
+            int(goal[1]),
+            0 if max_expansions is None else max_expansions,
+            -1 if max_cost is None else max_cost,
+        )
+        if not found:
+            return None
+
+        return [tuple(p) for p in trace(pred, int(goal[0]), int(goal[1])).tolist()]
+
+    def nearest_path(
+        self, start: Tuple[int64, int64], goals: Union[ndarray, Iterable[Tuple[int64, int64]]]
+    ) -> Union[List[Tuple[int, int]], None]:
+        """
+        Cheapest path from start to the closest of the goals, the search stops as soon as the first goal is reached.
+
+        Args:
+            start (Tuple[int64, int64]): Start position.
+            goals (Union[ndarray, Iterable[Tuple[int64, int64]]]): Boolean mask of the goals or their positions.
+        Returns:
+            Union[List[Tuple[int, int]], None]: Path from start to the reached goal (last element), None if no goal is reachable.
+        """
+        if start not in self:
+            return None
+
+        goals = goal_mask(goals, self.moves.shape) & self.component
+        if not goals.any():
+            return None
+
+        _, pred, goal = dijkstra(self.moves, self.costs, int(start[0]), int(start[1]), goals)
+        width = self.moves.shape[1]
+        return [tuple(p) for p in trace(pred, goal // width, goal % width).tolist()]
+
+    def to_networkx(self) -> nx.DiGraph:
+        """
+        Converts the grid to a networkx graph, nodes store their (row, col) in the "positions" attribute
+        and edges store the cost of entering the target position in the "weight" attribute.
+        """
+        graph = nx.DiGraph()
+        positions = list(zip(*(axis.tolist() for axis in np.nonzero(self.component))))
+        pos_to_node = {pos: node for node, pos in enumerate(positions)}
+        graph.add_nodes_from((node, {"positions": pos}) for pos, node in pos_to_node.items())
+
+        for bit, (dy, dx) in enumerate(DIRECTIONS):
+            ys, xs = np.nonzero(self.component & (self.moves & (1 << bit)).astype(bool))
+            for y, x in zip(ys.tolist(), xs.tolist()):
+                target = (y + int(dy), x + int(dx))
+                graph.add_edge(pos_to_node[(y, x)], pos_to_node[target], weight=int(self.costs[target]))
+
+        return graph
@@ -0,0 +1,172 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+from nle_utils.glyph import G
+from nle_utils.level import Level as DungeonLevel
+
+from nle_code_wrapper.bot.pathfinder.grid import bfs, build_move_mask
+from nle_code_wrapper.utils import utils
+
+if TYPE_CHECKING:
+    from nle_code_wrapper.bot import Bot
+    from nle_code_wrapper.bot.level import Level
+
+LevelKey = Tuple[int, int]
+Stairs = Tuple[LevelKey, Tuple[int, int]]
+
+
+class LevelGraph:
+    """
+    Graph of the visited levels used to plan routes between them. Nodes are stairs (level key and position),
+    stairs of the same level are connected by the number of steps between them on the remembered map,
+    stairs of different levels are connected when we used them to move between the levels. Stairs we did not use yet
+    are assumed to lead to the stairs of the neighbouring level of the same dungeon.
+    """
+
+    def __init__(self, bot: "Bot") -> None:
+        self.bot = bot
+        # stairs we moved through, both directions, and the action taking each of them ('>' or '<')
+        self.links: Dict[Stairs, Stairs] = {}
+        self.actions: Dict[Stairs, str] = {}
+        self._last: Optional[Tuple["Level", Tuple[int, int]]] = None
+        self._graph: Optional[nx.DiGraph] = None
+        self._signature = None
+
+    def update(self) -> None:
+        """
+        Records the stairs we used, if we changed levels since the last update.
+        """
+        level, position = self.bot.current_level, tuple(int(p) for p in self.bot.entity.position)
+        if self._last is not None:
+            last_level, last_position = self._last
+            if self.bot.levels.get(last_level.key()) is not last_level:
+                # new episode
+                self.links.clear()
+                self.actions.clear()
+            elif last_level is not level and last_level.objects[last_position] in G.STAIR_UP | G.STAIR_DOWN:
+                departure, arrival = (last_level.key(), last_position), (level.key(), position)
+                self.links[departure] = arrival
+                self.links[arrival] = departure
+                # the objects under us may not be known yet, we went down if we are deeper than before
+                down = level.level_number > last_level.level_number
+                self.actions[departure] = ">" if down else "<"
+                self.actions[arrival] = "<" if down else ">"
+        self._last = (level, position)
+
+    def stairs(self, key: LevelKey) -> Dict[Tuple[int, int], str]:
+        """
+        Known stairs of the level and the action used to take them ('>' or '<').
+        """
+        features = self.bot.terrain_features.get(key, {}).get("features", {})
+        stairs = {}
+        for name, action in (("stairs down", ">"), ("stairs up", "<")):
+            for position in features.get(name, []):
+                stairs[tuple(int(p) for p in position)] = action
+
+        for (link_key, position), action in self.actions.items():
+            if link_key == key and position not in stairs:
+                stairs[position] = action
+        return stairs
+
+    @property
+    def graph(self) -> nx.DiGraph:
+        """
+        The graph of the stairs, rebuilt only when the levels, their stairs or the used stairs change.
+        """
+        signature = (
+            tuple((key, id(level), level.version) for key, level in self.bot.levels.items()),
+            tuple((key, tuple(self.stairs(key).items())) for key in self.bot.levels),
+            len(self.links),
+        )
+        if self._graph is None or signature != self._signature:
+            self._graph = self._build()
+            self._signature = signature
+        return self._graph
+
+    def _build(self) -> nx.DiGraph:
+        graph = nx.DiGraph()
+        stairs = {key: self.stairs(key) for key in self.bot.levels}
+
+        for key, level in self.bot.levels.items():
+            positions = list(stairs[key])
+            graph.add_nodes_from((key, position) for position in positions)
+            for position in positions:
+                distances = self._level_distances(level, position)
+                for other in positions:
+                    if other != position and distances[other] >= 0:
+                        graph.add_edge((key, position), (key, other), weight=int(distances[other]))
+
+        # taking the stairs is a single action
+        for source, target in self.links.items():
+            if source in graph and target in graph:
+                graph.add_edge(source, target, weight=1, action=stairs[source[0]][source[1]])
+
+        linked = set(self.links)
+        for (dungeon_number, level_number), level_stairs in stairs.items():
+            for position, action in level_stairs.items():
+                source = ((dungeon_number, level_number), position)
+                if source in linked:
+                    continue
+                target_key = (dungeon_number, level_number + (1 if action == ">" else -1))
+                target_action = "<" if action == ">" else ">"
+                if target_key not in stairs:
+                    # we don't know where we will end up on the levels we haven't visited yet
+                    graph.add_edge(source, (target_key, None), weight=1, action=action)
+                    continue
+                for target_position, other_action in stairs[target_key].items():
+                    target = (target_key, target_position)
+                    if other_action == target_action and target not in linked:
+                        graph.add_edge(source, target, weight=1, action=action)
+
+        return graph
+
+    def _level_distances(self, level: "Level", start: Tuple[int, int]) -> np.ndarray:
+        """
+        Number of steps from start on the remembered map of the level, ignoring monsters.
+        """
+        passable = level.walkable.copy()
+        passable[start] = True
+        diagonal_blocked = utils.isin(level.objects, G.BOULDER, G.DOOR_OPENED) | level.doors
+        diagonal = level.dungeon_number != DungeonLevel.SOKOBAN.value
+        moves = build_move_mask(passable, diagonal_blocked, diagonal)
+        return bfs(moves, start[0], start[1])[0]
+
+    def route(self, key: LevelKey) -> Optional[List[Tuple[LevelKey, Tuple[int, int], str]]]:
+        """
+        The cheapest known route from our position to the level.
+
+        Args:
+            key (LevelKey): dungeon number and level number of the target level, it doesn't have to be visited yet
+                if it's next to a visited level of the same dungeon.
+        Returns:
+            Optional[List[Tuple[LevelKey, Tuple[int, int], str]]]: stairs to take in order, the level, the position
+            of the stairs and the action to take them. Empty if we are already there, None if there is no known route.
+        """
+        current = self.bot.current_level.key()
+        if current == key:
+            return []
+
+        graph = self.graph
+        # we start from our position on the current level, with monsters taken into account
+        distances = self.bot.pathfinder.distances(self.bot.entity.position)
+        graph.add_node("start")
+        graph.add_node("goal")
+        try:
+            for position in self.stairs(current):
+                if position in distances:
+                    graph.add_edge("start", (current, position), weight=distances[position])
+            for node in list(graph.nodes):
+                if isinstance(node, tuple) and node[0] == key:
+                    graph.add_edge(node, "goal", weight=0)
+            try:
+                nodes = nx.dijkstra_path(graph, "start", "goal")
+            except nx.NetworkXNoPath:
+                return None
+            route = [
+                (u[0], u[1], graph.edges[u, v]["action"]) for u, v in zip(nodes[1:-2], nodes[2:-1]) if u[0] != v[0]
+            ]
+        finally:
+            graph.remove_nodes_from(["start", "goal"])
+
+        return route
@@ -1,9 +1,13 @@
-from typing import TYPE_CHECKING, Any, List, Tuple, Union
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple, Union
 
+import numpy as np
 from nle import nethack
 from nle_utils.glyph import SS, C, G
 from nle_utils.level import Level as DungeonLevel
-from numpy import int64
+from numpy import int64, ndarray
+
+from nle_code_wrapper.bot.pathfinder.grid import DIRECTIONS, Window, build_move_mask, grow_window, window_position
+from nle_code_wrapper.utils import utils
 
 if TYPE_CHECKING:
     from nle_code_wrapper.bot import Bot
@@ -22,6 +26,10 @@ intermediate_directions = [
     (1, 1),
 ]
 
+# same order as the bits of the move mask, see `grid.DIRECTIONS`
+directions = cardinal_directions + intermediate_directions
+direction_bits = {dir: bit for bit, dir in enumerate(directions)}
+
 
 class Movements:
     """
@@ -46,6 +54,9 @@ class Movements:
         self.monster_collision = monster_collision
         self.cardinal_only = cardinal_only
 
+        self._moves: Optional[ndarray] = None
+        self._moves_state = None
+
     @property
     def walkable_diagonally(self) -> bool:
         # TODO: this should only include passing between small gaps
@@ -60,45 +71,34 @@ class Movements:
         # if his or her total inventory weight is 600 or less.
         # Otherwise, "You are carrying too much to get through."
         level = self.bot.current_level
-        total_weight = self.bot.inventory.weight
-        return level.dungeon_number != DungeonLevel.SOKOBAN.value and total_weight < 600
-
-    def walkable_cardinal(self, pos: Tuple[int64, int64], new_pos: Tuple[int64, int64]) -> bool:
-        level = self.bot.current_level
-        glyph_walkable = level.safe_walkable[new_pos]
-
-        if self.levitating and level.objects[new_pos] in frozenset.union(frozenset({SS.S_lava, SS.S_water}), G.BOULDER):
-            glyph_walkable = True
-
-        if self.monster_collision:
-            glyph_walkable = glyph_walkable and new_pos not in [e.position for e in self.bot.entities]
-
-        return glyph_walkable
+        return level.dungeon_number != DungeonLevel.SOKOBAN.value and self.bot.inventory.can_squeeze
 
-    def get_move_cardinal(
-        self, pos: Tuple[int64, int64], dir: Tuple[int, int], neighbors: List[Union[Any, Tuple[int64, int64]]]
-    ) -> None:
+    @property
+    def moves(self) -> ndarray:
         """
-        This method checks if the player can move in a cardinal direction.  If the player can move, then the new position is appended to the neighbors list.
-
-        Args:
-            pos (Tuple[int64, int64]): The current position of the player.
-            dir (Tuple[int, int]): The direction in which the player is trying to move.
-            neighbors (List[Union[Any, Tuple[int64, int64]]]): A list of possible moves for the player.
+        Move mask of the whole level, see `move_mask`. It is rebuilt only when the level, the monsters,
+        our position or the movement mode change.
         """
-        new_pos = (pos[0] + dir[0], pos[1] + dir[1])
-
-        # out of bounds
-        if not (0 <= new_pos[0] < C.SIZE_Y and 0 <= new_pos[1] < C.SIZE_X):
-            return
-
-        # check if not walkable
-        if self.walkable_cardinal(pos, new_pos):
-            neighbors.append(new_pos)
+        level = self.bot.current_level
+        state = (
+            level,
+            level.version,
+            self.levitating,
+            self.monster_collision,
+            self.cardinal_only,
+            self.walkable_diagonally,
+            tuple(entity.position for entity in self.bot.entities),
+            self.bot.entity.position,
+        )
+        if self._moves_state != state:
+            self._moves = self.move_mask()
+            self._moves.flags.writeable = False
+            self._moves_state = state
+        return self._moves
 
-    def walkable_intermediate(self, pos: Tuple[int64, int64], new_pos: Tuple[int64, int64]) -> bool:
+    def can_move(self, pos: Tuple[int64, int64], new_pos: Tuple[int64, int64]) -> bool:
         """
-        This method checks if the player can move in an intermediate direction.
+        This method checks if the player can move from pos to the adjacent new_pos.
 
         Args:
             pos (Tuple[int64, int64]): The current position of the player.
@@ -107,65 +107,29 @@ class Movements:
         Returns:
             bool: True if the player can move to the new position, False otherwise
         """
-        level = self.bot.current_level
+        bit = direction_bits.get((new_pos[0] - pos[0], new_pos[1] - pos[1]))
+        if bit is None or not (0 <= pos[0] < C.SIZE_Y and 0 <= pos[1] < C.SIZE_X):
+            return False
+        return bool(self.moves[pos[0], pos[1]] >> bit & 1)
+
+    def walkable_cardinal(self, pos: Tuple[int64, int64], new_pos: Tuple[int64, int64]) -> bool:
+        return self.can_move(pos, new_pos)
+
+    def walkable_intermediate(self, pos: Tuple[int64, int64], new_pos: Tuple[int64, int64]) -> bool:
         # we restrict diagonal movements in the doors
         # the character can only move diagonally if his or her total inventory weight is 600 or less.
         # Otherwise, "You are carrying too much to get through."
-        glyph_walkable = level.safe_walkable[new_pos]
-
-        if self.levitating and level.objects[new_pos] in frozenset.union(frozenset({SS.S_lava, SS.S_water}), G.BOULDER):
-            glyph_walkable = True
-
-        if self.monster_collision:
-            glyph_walkable = glyph_walkable and new_pos not in [e.position for e in self.bot.entities]
-
-        walkable = (
-            # can we walk there
-            glyph_walkable
-            # cannot move diagonally throught doors and boulders
-            and not level.objects[new_pos] in frozenset.union(G.BOULDER, G.DOOR_OPENED)
-            and not level.objects[pos] in frozenset.union(G.BOULDER, G.DOOR_OPENED)
-            and not level.doors[new_pos]
-            and not level.doors[pos]
-        )
-        return walkable
-
-    def get_move_intermediate(
-        self, pos: Tuple[int64, int64], dir: Tuple[int, int], neighbors: List[Union[Any, Tuple[int64, int64]]]
-    ) -> None:
-        """
-        This method checks if the player can move in an intermediate direction.  If the player can move, then the new position is appended to the neighbors list.
-
-        Args:
-            pos (Tuple[int64, int64]): The current position of the player.
-            dir (Tuple[int, int]): The direction in which the player is trying to move.
-            neighbors (List[Union[Any, Tuple[int64, int64]]]): A list of possible moves for the player
-        """
-        new_pos = (pos[0] + dir[0], pos[1] + dir[1])
-
-        # out of bounds
-        if not (0 <= new_pos[0] < C.SIZE_Y and 0 <= new_pos[1] < C.SIZE_X):
-            return
-
-        # check if not walkable
-        if self.walkable_intermediate(pos, new_pos):
-            neighbors.append(new_pos)
+        return self.can_move(pos, new_pos)
 
     def neighbors(self, node: Tuple[int64, int64]) -> List[Union[Any, Tuple[int64, int64]]]:
         """
         List of valid move destinations for the player from the current position.
         """
-        neighbors = []
-
-        for dir in cardinal_directions:
-            self.get_move_cardinal(node, dir, neighbors)
+        if not (0 <= node[0] < C.SIZE_Y and 0 <= node[1] < C.SIZE_X):
+            return []
 
-        if not self.cardinal_only:
-            if self.walkable_diagonally:
-                for dir in intermediate_directions:
-                    self.get_move_intermediate(node, dir, neighbors)
-
-        return neighbors
+        moves = self.moves[node[0], node[1]]
+        return [(node[0] + dy, node[1] + dx) for bit, (dy, dx) in enumerate(directions) if moves >> bit & 1]
 
     def adjacents(self, node: Tuple[int64, int64]) -> List[Union[Any, Tuple[int64, int64]]]:
         """
@@ -190,6 +154,72 @@ class Movements:
 
         return adjacents
 
+    def neighbor_mask(self, nodes: ndarray) -> ndarray:
+        """
+        Vectorized version of `neighbors` for many positions.
+
+        Args:
+            nodes (ndarray): (n, 2) positions
+        Returns:
+            ndarray: (n, 8) bool mask, ``mask[i, k]`` is set when ``neighbors(nodes[i])`` contains
+            the position in direction ``directions[k]``
+        """
+        ys, xs = nodes[:, 0], nodes[:, 1]
+        inside = (ys >= 0) & (ys < C.SIZE_Y) & (xs >= 0) & (xs < C.SIZE_X)
+        moves = np.zeros(len(nodes), np.uint8)
+        moves[inside] = self.moves[ys[inside], xs[inside]]
+        return (moves[:, None] >> np.arange(len(directions), dtype=np.uint8) & 1).astype(bool)
+
+    def adjacent_mask(self, nodes: ndarray) -> ndarray:
+        """
+        Vectorized version of `adjacents` for many positions, see `neighbor_mask`.
+        """
+        adjacent = nodes[:, None, :] + DIRECTIONS[None]
+        ys, xs = adjacent[..., 0], adjacent[..., 1]
+        mask = (ys >= 0) & (ys < C.SIZE_Y) & (xs >= 0) & (xs < C.SIZE_X)
+        mask[mask] = self.bot.current_level.walkable[ys[mask], xs[mask]]
+        if self.cardinal_only:
+            mask[:, len(cardinal_directions) :] = False
+        return mask
+
+    def move_mask(self, window: Optional[Window] = None) -> ndarray:
+        """
+        Vectorized version of `neighbors` for the whole level. Bit ``i`` of ``mask[y, x]`` is set when
+        ``neighbors((y, x))`` contains the position in direction ``grid.DIRECTIONS[i]``.
+
+        Args:
+            window (Optional[Window]): compute the mask only for this part of the level
+        Returns:
+            ndarray: uint8 move mask of the current level (or the window)
+        """
+        level = self.bot.current_level
+        if window is None:
+            window = (slice(0, C.SIZE_Y), slice(0, C.SIZE_X))
+
+        # moves from the window depend on the cells around it
+        outer, inner = grow_window(window, 1, level.walkable.shape)
+
+        passable = level.walkable[outer].copy()
+        if self.levitating:
+            passable |= utils.isin(level.objects[outer], frozenset({SS.S_lava, SS.S_water}), G.BOULDER)
+
+        if self.monster_collision:
+            for entity in self.bot.entities:
+                pos = window_position(entity.position, outer)
+                if pos is not None:
+                    passable[pos] = False
+
+        # we are standing here, so we can always come back
+        pos = window_position(self.bot.entity.position, outer)
+        if pos is not None:
+            passable[pos] = True
+
+        # cannot move diagonally throught doors and boulders
+        diagonal_blocked = utils.isin(level.objects[outer], G.BOULDER, G.DOOR_OPENED) | level.doors[outer]
+        diagonal = not self.cardinal_only and self.walkable_diagonally
+
+        return build_move_mask(passable, diagonal_blocked, diagonal)[inner]
+
     def update(self):
         if self.bot.blstats.prop_mask & nethack.BL_MASK_LEV:
             self.levitating = True
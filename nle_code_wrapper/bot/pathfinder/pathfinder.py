@@ -1,17 +1,26 @@
 import io
-from collections import deque
 from itertools import pairwise
-from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import matplotlib.pyplot as plt
 import networkx as nx
 import numpy as np
 from nle.nethack import actions as A
-from nle_utils.glyph import G
-from numpy import int64
+from nle_utils.glyph import C, G
+from numpy import int64, ndarray
 from PIL import Image
+from scipy import ndimage
 
 from nle_code_wrapper.bot.exceptions import BotPanic, UnexpectedPotion
+from nle_code_wrapper.bot.pathfinder.grid import (
+    DistanceField,
+    MovementGrid,
+    Window,
+    bounding_window,
+    grow_window,
+    window_position,
+)
+from nle_code_wrapper.bot.pathfinder.levels import LevelGraph
 
 if TYPE_CHECKING:
     from nle_code_wrapper.bot import Bot
@@ -63,7 +72,17 @@ class Pathfinder:
         self.bot: Bot = bot
         self.trap_cost = 1000
         self.monster_cost = 50
+        # entering the shops we know of, we only go shopping on purpose
+        self.shop_cost = 20
+        # goto checks this many next moves every step, blocked paths are repaired
+        # with a search of at most repair_expansions positions rejoining repair_horizon moves later
+        self.lookahead = 5
+        self.repair_horizon = 8
+        self.repair_expansions = 256
+        # extra costs of entering terrain, e.g. {frozenset({SS.S_lava}): 100} to avoid lava when levitating
+        self.terrain_costs: Dict[frozenset, int] = {}
         self._graph_cache = {}
+        self.level_graph = LevelGraph(bot)
 
     @property
     def direction_movements(self) -> Dict[str, Tuple[int, int]]:
@@ -78,119 +97,140 @@ class Pathfinder:
             "southeast": (1, 1),
         }
 
-    def create_movements_graph(self, no_cache: bool = False):
+    def create_movements_grid(self, no_cache: bool = False) -> MovementGrid:
+        """
+        Returns the movements grid for the current movement mode. Grids are cached per movement mode
+        and refreshed only where the level, the monsters or our position changed since they were built.
+        """
         if no_cache:
-            return self._create_movements_graph()
-
-        key = (
-            self.bot.movements.levitating,
-            self.bot.movements.cardinal_only,
-            self.bot.movements.monster_collision,
+            return self._create_movements_grid()
+
+        level = self.bot.current_level
+        key = self._movement_key()
+        # levels are compared by identity, the level objects are recreated on reset
+        state = (
+            level,
+            level.version,
+            tuple(entity.position for entity in self.bot.entities),
+            self.bot.entity.position,
         )
 
-        # cache the graph for the start position
-        if key not in self._graph_cache:
-            self._graph_cache[key] = self._create_movements_graph()
-
-        return self._graph_cache[key]
+        grid = self._graph_cache.get(key)
+        if grid is None or grid.state[0] is not level:
+            grid = self._graph_cache[key] = self._create_movements_grid()
+        elif grid.state != state:
+            grid = self._graph_cache[key] = self._update_movements_grid(grid)
+        grid.state = state
+
+        return grid
+
+    def _movement_key(self) -> Tuple:
+        movements = self.bot.movements
+        return (
+            movements.levitating,
+            movements.cardinal_only,
+            movements.monster_collision,
+            movements.walkable_diagonally,
+            self.trap_cost,
+            self.monster_cost,
+            tuple(self.terrain_costs.items()),
+        )
 
-    def _create_movements_graph(self, start_count: int = 0) -> nx.Graph:
+    def _update_movements_grid(self, grid: MovementGrid) -> MovementGrid:
         """
-        Creates a networkx graph from a boolean position matrix where nodes represent True positions
-        and edges connect positions that are neighbors according to self.neighbors().
-
-        Args:
-            position_matrix (np.ndarray): Boolean matrix where True values represent valid positions
-            start_count (int, optional): Starting index for node numbering. Defaults to 0.
+        Recomputes only the part of the grid which could have changed since the grid was built.
+        """
+        _, version, entities, origin = grid.state
+        dirty = self.bot.current_level.changed_since(version)
+        if dirty is None:
+            return self._create_movements_grid()
+
+        # monsters block their positions and make the positions around them more expensive,
+        # we can always come back to the position we are standing on
+        for pos in set(entities).symmetric_difference(entity.position for entity in self.bot.entities):
+            dirty[pos] = True
+        dirty[origin] = True
+        dirty[self.bot.entity.position] = True
+
+        # moves from the neighbors of the changed positions are affected as well
+        window = bounding_window(dirty, margin=1)
+        grid.update(window, *self._movement_arrays(window), self.bot.entity.position)
+        return grid
+
+    def _create_movements_grid(self) -> MovementGrid:
+        """
+        Creates the array based movements graph of the current level, positions are connected
+        if they are neighbors according to self.neighbors().
 
         Returns:
-            nx.Graph: Graph with nodes representing positions and edges connecting neighboring positions
-        """
-        graph = nx.DiGraph()
-        pos_to_node = {}
-        node_counter = start_count
-
-        # Queue for BFS: (position, steps_taken)
-        start_position = self.bot.entity.position
-        queue = deque([start_position])
-        seen = {start_position}
-
-        pos_to_node[start_position] = node_counter
-        graph.add_node(node_counter)
-        node_counter += 1
-
-        while queue:
-            current_pos = queue.popleft()
-            current_node = pos_to_node[current_pos]
-
-            # Check all neighbors
-            for nbr in self.neighbors(current_pos):
-                nbr_node = pos_to_node.get(nbr)
-
-                if nbr_node is not None:
-                    # If neighbor already exists, just add edge if not present
-                    if not graph.has_edge(current_node, nbr_node):
-                        graph.add_edge(current_node, nbr_node, weight=1)
-                        graph.add_edge(nbr_node, current_node, weight=1)
-                    continue
-
-                if nbr in seen:
-                    continue
-
-                # Add new position to graph
-                pos_to_node[nbr] = node_counter
-                graph.add_node(node_counter)
-                graph.add_edge(current_node, node_counter, weight=1)
-                graph.add_edge(node_counter, current_node, weight=1)
-
-                # Add to BFS queue
-                queue.append(nbr)
-                seen.add(nbr)
-                node_counter += 1
-
-        # Store the (row, col) positions as node attributes
-        nx.set_node_attributes(graph, {node_id: pos for pos, node_id in pos_to_node.items()}, name="positions")
-
-        danger_zone = set()
-        for pos in [entity.position for entity in self.bot.entities]:
-            # add monster position and its adjacents to danger zone
-            danger_zone.add(tuple(pos))
-            for adjacent in self.adjacents(pos):
-                danger_zone.add(tuple(adjacent))
+            MovementGrid: move mask and costs of entering each position, restricted to positions reachable from the bot
+        """
+        return MovementGrid(*self._movement_arrays(), self.bot.entity.position)
 
-        # TODO: compute a distance field from the monsters and penalize a radius around the monster
+    def _movement_arrays(self, window: Optional[Window] = None) -> Tuple[ndarray, ndarray]:
+        """
+        Move mask and costs of entering each position of the current level (or the window).
+        """
+        if window is None:
+            window = (slice(0, C.SIZE_Y), slice(0, C.SIZE_X))
+            # the grid is updated in place, the mask of the movements is shared
+            moves = self.bot.movements.moves.copy()
+        else:
+            moves = self.bot.movements.move_mask(window)
 
-        for u, v in graph.edges:
-            v_pos = tuple(graph._node[v]["positions"])
-            # Add penalty for edges leading to dangerous positions
-            # If after moving we remain in danger zone, set higher weight
-            if v_pos in danger_zone:
-                graph[u][v]["weight"] = self.monster_cost
+        costs = self._movement_costs(window)
 
-            if self.bot.current_level.objects[v_pos] in G.TRAPS:
-                graph[u][v]["weight"] = self.trap_cost
+        return moves, costs
+
+    def _movement_costs(self, window: Window) -> ndarray:
+        """
+        Costs of entering each position of the window, the highest of the cost layers and 1.
+        """
+        level = self.bot.current_level
+        layers = [
+            self._danger_zone_costs(window),
+            level.cost_layer(level.known_traps, {G.TRAPS: self.trap_cost}, window),
+            level.cost_layer(level.objects, self.terrain_costs, window),
+            level.penalty_costs(window),
+        ]
 
-        return graph
+        costs = np.ones(level.walkable[window].shape, np.int32)
+        for layer in layers:
+            np.maximum(costs, layer, out=costs)
+        return costs
 
-    def distances(self, start_pos: Tuple[int64, int64]) -> dict:
+    def _danger_zone_costs(self, window: Window) -> ndarray:
         """
-        Returns a dictionary where the keys are graph node IDs and
-        the values are their distance from the given start_node.
+        Monster positions and their adjacents are dangerous, moving there costs ``monster_cost``.
         """
-        graph = self.create_movements_graph()
-        start_node = [node for node in graph.nodes if graph._node[node]["positions"] == start_pos]
-        if start_node:
-            start_node = start_node[0]
-        else:
-            return {}
+        level = self.bot.current_level
+
+        # add monster positions and their adjacents to danger zone
+        outer, inner = grow_window(window, 1, level.walkable.shape)
+        monsters = np.zeros_like(level.walkable[outer])
+        for entity in self.bot.entities:
+            pos = window_position(entity.position, outer)
+            if pos is not None:
+                monsters[pos] = True
+        structure = ndimage.generate_binary_structure(2, 1 if self.bot.movements.cardinal_only else 2)
+        danger_zone = monsters | (ndimage.binary_dilation(monsters, structure) & level.walkable[outer])
 
-        # Use NetworkX's single_source_shortest_path_length to compute distances
-        node_distances = dict(nx.single_source_shortest_path_length(graph, start_node))
+        # TODO: compute a distance field from the monsters and penalize a radius around the monster
+        return np.where(danger_zone[inner], self.monster_cost, 0).astype(np.int32)
 
-        node_positions = nx.get_node_attributes(graph, "positions")
-        position_distances = {node_positions[node]: distance for node, distance in node_distances.items()}
+    def create_movements_graph(self, no_cache: bool = False) -> nx.DiGraph:
+        """
+        Networkx view of the movements grid, nodes store their (row, col) in the "positions" attribute.
+        """
+        return self.create_movements_grid(no_cache=no_cache).to_networkx()
 
-        return position_distances
+    def distances(self, start_pos: Tuple[int64, int64]) -> DistanceField:
+        """
+        Returns a dictionary-like distance field where the keys are positions and
+        the values are their distance (number of steps) from the given start_pos.
+        Fields are shared by all callers until the level, the monsters or our position change.
+        """
+        return self.create_movements_grid().distances(start_pos)
 
     def distance(self, n1: Tuple[int64, int64], n2: Tuple[int64, int64]) -> int64:
         distances = self.distances(n1)
@@ -201,47 +241,61 @@ class Pathfinder:
         start: Tuple[int64, int64],
         goal: Tuple[int64, int64],
         no_cache: bool = False,
+        max_expansions: Optional[int] = None,
+        max_cost: Optional[int] = None,
     ) -> Union[List[Tuple[int64, int64]], None]:
-        graph = self.create_movements_graph(no_cache=no_cache)
-
-        # Convert positions to node IDs
-        node_positions = nx.get_node_attributes(graph, "positions")
-        node_to_pos = {tuple(pos): node for node, pos in node_positions.items()}
-
-        # Get node IDs for start and end positions
-        start_node = node_to_pos[tuple(start)]
-        # TODO:
-        # if tuple(goal) in node_to_pos:
-        # TypeError: 'NoneType' object is not iterable
-        if tuple(goal) in node_to_pos:
-            end_node = node_to_pos[tuple(goal)]
-        else:
-            return None  # End point not reachable
-
-        try:
-            # Find shortest path using NetworkX
-            path_nodes = nx.shortest_path(graph, start_node, end_node, weight="weight")
-
-            # Convert path nodes back to positions
-            path_positions = [node_positions[node] for node in path_nodes]
-            return path_positions
+        """
+        Get path from start to goal using the A* algorithm with the chebyshev distance as heuristic.
 
-        except nx.NetworkXNoPath:
-            return None  # No path exists between the points
+        Args:
+            start (Tuple[int64, int64]): Start position.
+            goal (Tuple[int64, int64]): Goal position.
+            max_expansions (Optional[int]): Stop searching after this many expanded positions.
+            max_cost (Optional[int]): Stop searching once the path is known to cost more than this.
+        Returns:
+            Union[List[Tuple[int64, int64]], None]: Path to goal if exists within the bounds, otherwise None.
+        """
+        grid = self.create_movements_grid(no_cache=no_cache)
+        return grid.shortest_path(start, goal, max_expansions=max_expansions, max_cost=max_cost)
 
-    def get_path_to(self, goal: Tuple[int64, int64], no_cache: bool = False) -> Union[List[Tuple[int64, int64]], None]:
+    def get_path_to(
+        self,
+        goal: Tuple[int64, int64],
+        no_cache: bool = False,
+        max_expansions: Optional[int] = None,
+        max_cost: Optional[int] = None,
+    ) -> Union[List[Tuple[int64, int64]], None]:
         """
         Get path to goal using the A* algorithm.
 
         Args:
             goal (Tuple[int64, int64]): Goal position.
+            max_expansions (Optional[int]): Stop searching after this many expanded positions.
+            max_cost (Optional[int]): Stop searching once the path is known to cost more than this.
         Returns:
             Union[List[Tuple[int64, int64]], None]: Path to goal if exists, otherwise None.
         """
 
-        result = self.get_path_from_to(self.bot.entity.position, goal, no_cache=no_cache)
+        result = self.get_path_from_to(
+            self.bot.entity.position, goal, no_cache=no_cache, max_expansions=max_expansions, max_cost=max_cost
+        )
         return result
 
+    def get_path_to_nearest(
+        self, goals: Union[ndarray, Iterable[Tuple[int64, int64]]], no_cache: bool = False
+    ) -> Union[List[Tuple[int64, int64]], None]:
+        """
+        Get path to the closest of the goals with a single search, which stops at the first goal reached.
+
+        Args:
+            goals (Union[ndarray, Iterable[Tuple[int64, int64]]]): Boolean mask of the goals or their positions.
+        Returns:
+            Union[List[Tuple[int64, int64]], None]: Path to the reached goal (last element) if any goal is reachable,
+            otherwise None.
+        """
+        grid = self.create_movements_grid(no_cache=no_cache)
+        return grid.nearest_path(self.bot.entity.position, goals)
+
     def random_move(self) -> None:
         """
         Randomly move the bot in any direction.
@@ -286,13 +340,16 @@ class Pathfinder:
                 f"expected ({dir[0]}, {dir[1]}), got ({self.bot.entity.position[0]}, {self.bot.entity.position[1]})"
             )
 
-    def goto(self, goal: Tuple[int64, int64], fast: bool = False) -> bool:
+    def goto(
+        self, goal: Tuple[int64, int64], fast: bool = False, path: Optional[List[Tuple[int64, int64]]] = None
+    ) -> bool:
         """
         Move the bot to the given goal position. If the goal is not reachable, raise BotPanic.
 
         Args:
             goal (Tuple[int64, int64]): Goal position.
             fast (bool): Whether to use fast_goto or not.
+            path (Optional[List[Tuple[int64, int64]]]): Already computed path to the goal, used for the first leg.
         Returns:
             bool: True if the bot successfully reaches the goal, False otherwise.
         """
@@ -302,30 +359,48 @@ class Pathfinder:
                 raise BotPanic("end point is no longer accessible")
             if len(path) > 2:
                 self.fast_goto(goal)
+                path = None
 
-        cont = True
-        while cont and self.bot.entity.position != goal:
+        # a precomputed path is only valid from where the bot stands
+        if path is not None and tuple(path[0]) != self.bot.entity.position:
+            path = None
+        if path is None:
             path = self.get_path_to(goal)
+
+        while self.bot.entity.position != goal:
             if path is None:
                 raise BotPanic("end point is no longer accessible")
-            path = path[1:]
 
-            for point in path:
-                # TODO: check if there is peaceful monster
-                cardinal = np.abs(np.array(self.bot.entity.position) - point).sum() == 1
-                if cardinal:
-                    walkable = self.bot.movements.walkable_cardinal(self.bot.entity.position, point)
-                else:
-                    walkable = self.bot.movements.walkable_intermediate(self.bot.entity.position, point)
-                if not walkable:
-                    cont = True
-                    break
-                self.move(point)
-            else:
-                cont = False
+            # TODO: check if there is peaceful monster
+            # we keep the path and check only the next few moves against the latest map
+            blocked = self.create_movements_grid().first_blocked(path, self.lookahead)
+            if blocked is not None:
+                path = self.repair_path(path, blocked)
+                continue
+
+            self.move(path[1])
+            path = path[1:]
 
         return True
 
+    def repair_path(self, path: List[Tuple[int64, int64]], blocked: int) -> Union[List[Tuple[int64, int64]], None]:
+        """
+        Repairs the path blocked at the move ``path[blocked] -> path[blocked + 1]`` with a bounded search
+        from the start of the path to a position a few steps after the blocked move. If there is no such detour
+        the whole path is planned again.
+
+        Args:
+            path (List[Tuple[int64, int64]]): Path starting at our position.
+            blocked (int): Index of the first move which is not possible anymore.
+        Returns:
+            Union[List[Tuple[int64, int64]], None]: Repaired path to the same goal, None if the goal is not reachable.
+        """
+        rejoin = min(blocked + 1 + self.repair_horizon, len(path) - 1)
+        detour = self.get_path_from_to(path[0], path[rejoin], max_expansions=self.repair_expansions)
+        if detour is not None:
+            return detour + path[rejoin + 1 :]
+        return self.get_path_from_to(path[0], path[-1])
+
     def move_cursor(self, goal):
         cursor_position = self.bot.entity.position
 
@@ -378,19 +453,66 @@ class Pathfinder:
         Check if the goal is reachable from the start position.
         """
 
-        distances = self.distances(start)
         positions = self.adjacents(goal) if adjacent else self.neighbors(goal)
+        return self.distances(start).closest(positions)
 
-        position = min(
-            (tuple(n) for n in positions if distances.get(tuple(n)) is not None),
-            key=lambda n: distances.get(n, np.inf),
-            default=None,
-        )
+    def reachable_many(
+        self, start: Tuple[int64, int64], goals: Iterable[Tuple[int64, int64]], adjacent: bool = False
+    ) -> Tuple[ndarray, ndarray]:
+        """
+        Batched version of `reachable`, all goals are checked with a single search from start.
 
-        return position
+        Args:
+            start (Tuple[int64, int64]): Start position.
+            goals (Iterable[Tuple[int64, int64]]): Goal positions.
+            adjacent (bool): Look at the adjacent positions of the goals instead of their neighbors.
+        Returns:
+            Tuple[ndarray, ndarray]: (n, 2) closest adjacent or neighbor position of every goal
+            and (n,) its distance from start, -1 for the goals which are not reachable.
+        """
+        goals = np.array([tuple(goal) for goal in goals], dtype=np.int64).reshape(-1, 2)
+        movements = self.bot.movements
+        valid = movements.adjacent_mask(goals) if adjacent else movements.neighbor_mask(goals)
+        return self.distances(start).closest_around(goals, valid)
+
+    def choke_points(self) -> List[Tuple[int, int]]:
+        """
+        Positions whose removal disconnects the positions reachable from ours (corridors, doorways).
+        """
+        grid = self.create_movements_grid()
+        return [tuple(pos) for pos in np.argwhere(grid.articulation_points()).tolist()]
+
+    def approach_counts(self, spots: Iterable[Tuple[int64, int64]], sources: Iterable[Tuple[int64, int64]]) -> ndarray:
+        """
+        For every spot, the number of adjacent positions the sources (e.g. monsters) can reach
+        without passing through the spot.
+        """
+        grid = self.create_movements_grid()
+        adjacent = self.bot.current_level.walkable
+        return grid.approach_counts(spots, sources, adjacent, diagonal=not self.bot.movements.cardinal_only)
 
     def update(self):
-        self._graph_cache.clear()
+        # grids are invalidated lazily in `create_movements_grid`, here we only drop grids of the other levels
+        level = self.bot.current_level
+        for key, grid in list(self._graph_cache.items()):
+            if grid.state is None or grid.state[0] is not level:
+                del self._graph_cache[key]
+        self.level_graph.update()
+
+    def route_to(
+        self, dungeon_number: int64, level_number: int64
+    ) -> Optional[List[Tuple[Tuple[int, int], Tuple[int, int], str]]]:
+        """
+        Cheapest known route to another level over the stairs of the visited levels, see `LevelGraph.route`.
+
+        Args:
+            dungeon_number (int64): Dungeon of the target level.
+            level_number (int64): Level number of the target level.
+        Returns:
+            Optional[List[Tuple[Tuple[int, int], Tuple[int, int], str]]]: stairs to take in order
+            (level, position, action), None if there is no known route.
+        """
+        return self.level_graph.route((int(dungeon_number), int(level_number)))
 
     def render_movements_graph(
         self,
@@ -46,11 +46,14 @@ class Pvp:
                 return
 
             entities = [entity for entity in self.bot.entities if entity.glyph == self.target.glyph]
-            closest_entity = min(
-                entities,
-                key=lambda entity: pathfinder.distance(self.bot.entity.position, entity.position),
-                default=None,
+            _, distances = pathfinder.reachable_many(
+                self.bot.entity.position, [entity.position for entity in entities], adjacent=True
             )
+            closest_entity = min(
+                zip(entities, distances),
+                key=lambda pair: pair[1] if pair[1] >= 0 else np.inf,
+                default=(None, None),
+            )[0]
             if closest_entity:
                 self.target = closest_entity
             else:
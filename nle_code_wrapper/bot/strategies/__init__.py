@@ -111,6 +111,7 @@ from nle_code_wrapper.bot.strategies.goto import (
     goto_corridor_north,
     goto_corridor_south,
     goto_corridor_west,
+    goto_level,
     goto_room,
     goto_room_east,
     goto_room_north,
@@ -49,15 +49,9 @@ def escape_upstairs(bot: "Bot") -> bool:
     feature = features.get("stairs up", None)
 
     if feature is not None:
-        distances = bot.pathfinder.distances(bot.entity.position)
-        closest_feature = min(
-            (tuple(f) for f in feature if distances.get(tuple(f)) is not None),
-            key=lambda f: distances.get(f, np.inf),
-            default=None,
-        )
-
-        if closest_feature:
-            escape_to_location(bot, closest_feature)
+        path = bot.pathfinder.get_path_to_nearest(feature)
+        if path is not None:
+            escape_to_location(bot, path[-1])
             bot.step(A.MiscDirection.UP)
             return True
 
@@ -73,15 +67,9 @@ def escape_downstairs(bot: "Bot") -> bool:
     feature = features.get("stairs down", None)
 
     if feature is not None:
-        distances = bot.pathfinder.distances(bot.entity.position)
-        closest_feature = min(
-            (tuple(f) for f in feature if distances.get(tuple(f)) is not None),
-            key=lambda f: distances.get(f, np.inf),
-            default=None,
-        )
-
-        if closest_feature:
-            escape_to_location(bot, closest_feature)
+        path = bot.pathfinder.get_path_to_nearest(feature)
+        if path is not None:
+            escape_to_location(bot, path[-1])
             bot.step(A.MiscDirection.DOWN)
             return True
 
@@ -96,16 +84,10 @@ def escape_room(bot: "Bot") -> bool:
     room_labels, num_rooms = room_detection(bot)
 
     # since the monster cost is pretty high we will always pick the safest room by default
-    room_coords = np.argwhere(room_labels)
-    distances = bot.pathfinder.distances(bot.entity.position)
+    path = bot.pathfinder.get_path_to_nearest(np.argwhere(room_labels))
 
-    closest_room = min(
-        (tuple(coord) for coord in room_coords if distances.get(tuple(coord)) is not None),
-        key=lambda coord: distances.get(tuple(coord), np.inf),
-        default=None,
-    )
-
-    if closest_room:
+    if path is not None:
+        closest_room = path[-1]
         escape_to_location(bot, closest_room)
         bot.pathfinder.goto(closest_room)
         return True
@@ -16,21 +16,11 @@ from nle_code_wrapper.utils.strategies import (
 
 def get_revelable_positions(bot: "Bot", labeled_features):
     """
-    Finds walkable tiles that unvail new areas, based on the edges
+    Finds walkable tiles that unvail new areas, based on the edges (see `Level.frontier`)
     """
-    # get current feature
-    level = bot.current_level
-    # current_feature = labeled_features == labeled_features[bot.entity.position]
-
-    # get unexplored positions of the room
-    structure = ndimage.generate_binary_structure(2, 2)
-    unexplored_edges = np.logical_and(ndimage.binary_dilation(~level.seen, structure), level.seen)
-    walkable_edges = np.logical_and(unexplored_edges, level.walkable)  # we use level.walkable to exclude walls etc.
-    discovery_potential = np.logical_and(walkable_edges, ~level.was_on)
-    feature_unexplored = np.logical_and(labeled_features, discovery_potential)
-    unexplored_positions = np.argwhere(feature_unexplored)
-
-    return unexplored_positions
+    # get unexplored positions of the features
+    # we use the frontier of the level, walkable positions next to the unseen ones where we weren't yet
+    return np.argwhere(np.logical_and(labeled_features, bot.current_level.frontier))
 
 
 def get_unvisited_positions(bot: "Bot", labeled_features):
@@ -81,16 +71,16 @@ def explore_once(
     unexplored_positions = get_positions(bot, feature_labels)
 
     direction_filters = {
-        "west": lambda pos: pos[1] < bot.entity.position[1],
-        "east": lambda pos: pos[1] > bot.entity.position[1],
-        "north": lambda pos: pos[0] < bot.entity.position[0],
-        "south": lambda pos: pos[0] > bot.entity.position[0],
-        "all": lambda pos: True,
+        "west": lambda positions: positions[:, 1] < bot.entity.position[1],
+        "east": lambda positions: positions[:, 1] > bot.entity.position[1],
+        "north": lambda positions: positions[:, 0] < bot.entity.position[0],
+        "south": lambda positions: positions[:, 0] > bot.entity.position[0],
+        "all": lambda positions: np.ones(len(positions), bool),
     }
 
     filter_func = direction_filters.get(direction.lower())
     if filter_func:
-        unexplored_positions = np.array([position for position in unexplored_positions if filter_func(position)])
+        unexplored_positions = unexplored_positions[filter_func(unexplored_positions)]
 
         # prioritize positions in the room
         room_mask = labeled_rooms > 0
@@ -2,7 +2,7 @@ from nle_utils.glyph import G
 
 from nle_code_wrapper.bot import Bot
 from nle_code_wrapper.bot.strategy import strategy
-from nle_code_wrapper.utils.utils import coords
+from nle_code_wrapper.utils import utils
 
 
 @strategy
@@ -11,18 +11,13 @@ def explore_items(bot: "Bot"):
     Explore the map by going to the closest unexplored item.
     """
     level = bot.current_level
-    item_coords = coords(bot.glyphs, G.OBJECTS)
-    distances = bot.pathfinder.distances(bot.entity.position)
+    items = utils.isin(bot.glyphs, G.OBJECTS) & ~level.was_on
 
     # go to closest item which is reachable and unexplored
-    item = min(
-        (i for i in item_coords if i in distances and not level.was_on[i]),
-        key=lambda i: distances[i],
-        default=None,
-    )
+    path = bot.pathfinder.get_path_to_nearest(items)
 
-    if item:
-        bot.pathfinder.goto(item)
+    if path is not None:
+        bot.pathfinder.goto(path[-1], path=path)
         return True
     else:
         return False
@@ -1,6 +1,5 @@
 from typing import List, Tuple
 
-import networkx as nx
 import numpy as np
 from nle.nethack import actions as A
 
@@ -67,31 +66,30 @@ def fight_melee(bot: "Bot") -> bool:
     # def is_peaceful(bot: "Bot", entity: Entity):
     #     return False
 
-    neighbors = [bot.pathfinder.reachable(bot.entity.position, e.position, adjacent=True) for e in bot.entities]
-    distances = bot.pathfinder.distances(bot.entity.position)
+    _, distances = bot.pathfinder.reachable_many(bot.entity.position, [e.position for e in bot.entities], adjacent=True)
 
-    # Create list of tuples (neighbor, entity, is_peaceful)
+    # Create list of tuples (distance, entity, is_peaceful)
     entities_info = [
-        (neighbor, entity, is_peaceful(bot, entity))
-        for neighbor, entity in zip(neighbors, bot.entities)
-        if neighbor is not None
+        (distance, entity, is_peaceful(bot, entity))
+        for distance, entity in zip(distances, bot.entities)
+        if distance >= 0
     ]
 
     # First try to find the closest hostile monster
-    hostile_targets = [(neighbor, entity) for neighbor, entity, peaceful in entities_info if not peaceful]
+    hostile_targets = [(distance, entity) for distance, entity, peaceful in entities_info if not peaceful]
 
     if hostile_targets:
         # Attack closest hostile monster
-        adjacent, entity = min(hostile_targets, key=lambda pair: distances.get(pair[0], np.inf))
+        distance, entity = min(hostile_targets, key=lambda pair: pair[0])
         bot.pvp.attack_melee(entity)
         return True
 
     # If no hostile monsters, try peaceful ones
-    peaceful_targets = [(neighbor, entity) for neighbor, entity, peaceful in entities_info if peaceful]
+    peaceful_targets = [(distance, entity) for distance, entity, peaceful in entities_info if peaceful]
 
     if peaceful_targets:
         # Attack closest peaceful monster
-        adjacent, entity = min(peaceful_targets, key=lambda pair: distances.get(pair[0], np.inf))
+        distance, entity = min(peaceful_targets, key=lambda pair: pair[0])
         bot.pvp.attack_melee(entity)
         return True
 
@@ -105,11 +103,10 @@ def fight_ranged(bot: "Bot") -> bool:
     """
     bot.movements = Movements(bot, monster_collision=False)
 
-    neigbors = [bot.pathfinder.reachable(bot.entity.position, e.position, adjacent=True) for e in bot.entities]
-    distances = bot.pathfinder.distances(bot.entity.position)
-    adjacent, entity = min(
-        ((neighbor, e) for neighbor, e in zip(neigbors, bot.entities) if neighbor is not None),
-        key=lambda pair: distances.get(pair[0], np.inf),
+    _, distances = bot.pathfinder.reachable_many(bot.entity.position, [e.position for e in bot.entities], adjacent=True)
+    distance, entity = min(
+        ((distance, e) for distance, e in zip(distances, bot.entities) if distance >= 0),
+        key=lambda pair: pair[0],
         default=(None, None),
     )
 
@@ -144,9 +141,8 @@ def wait_for_monster(bot: "Bot") -> bool:
     """
     bot.movements = Movements(bot, monster_collision=False)
 
-    nearby_monsters = [
-        e for e in bot.entities if bot.pathfinder.reachable(bot.entity.position, e.position, adjacent=True) is not None
-    ]
+    _, distances = bot.pathfinder.reachable_many(bot.entity.position, [e.position for e in bot.entities], adjacent=True)
+    nearby_monsters = [e for e, distance in zip(bot.entities, distances) if distance >= 0]
     if not nearby_monsters:
         return False
 
@@ -171,9 +167,8 @@ def fight_multiple_monsters(bot: "Bot") -> bool:
     bot.movements = Movements(bot, monster_collision=False)
 
     # Find tactical positions: corridor ends and doorways
-    nearby_monsters = [
-        e for e in bot.entities if bot.pathfinder.reachable(bot.entity.position, e.position, adjacent=True) is not None
-    ]
+    _, distances = bot.pathfinder.reachable_many(bot.entity.position, [e.position for e in bot.entities], adjacent=True)
+    nearby_monsters = [e for e, distance in zip(bot.entities, distances) if distance >= 0]
     if not nearby_monsters:
         return False
     tactical_positions = find_tactical_positions(bot, bot.entities)
@@ -225,35 +220,15 @@ def find_tactical_positions(bot: "Bot", nearby_monsters: List[Entity]) -> List[T
     """
     Finds positions which allows the bot to fight multiple monsters one at a time.
     """
-
-    def is_good_tactical_spot(tactical_spot):
-        # count number of monster that can hit
-        number_of_tiles_reachable = 0
-        for adjacent in bot.pathfinder.adjacents(tactical_spot):
-            for monster in nearby_monsters:
-                reachable = bot.pathfinder.reachable(adjacent, monster.position)
-                if reachable is None:
-                    continue
-
-                path = bot.pathfinder.get_path_from_to(adjacent, reachable)
-                if path is None:
-                    continue
-
-                if tactical_spot not in path:
-                    number_of_tiles_reachable += 1
-                    break
-
-        return number_of_tiles_reachable == 1
-
-    graph = bot.pathfinder.create_movements_graph(bot.entity.position)
-
-    tactical_spots = []
-    # Find articulation points (potential corridor/chokepoint positions)
-    for choke in nx.articulation_points(graph.to_undirected()):
-        choke_pos = tuple(graph._node[choke]["positions"])
-        # Check neighbors of articulation points
+    # positions next to the choke points (corridor ends, doorways)
+    candidates = []
+    for choke_pos in bot.pathfinder.choke_points():
         for neighbor in bot.pathfinder.adjacents(choke_pos):
-            if is_good_tactical_spot(neighbor):
-                tactical_spots.append(neighbor)
-
-    return tactical_spots
+            if neighbor not in candidates:
+                candidates.append(neighbor)
+    if not candidates:
+        return []
+
+    # good spots can be approached by the monsters from a single adjacent position
+    counts = bot.pathfinder.approach_counts(candidates, [monster.position for monster in nearby_monsters])
+    return [spot for spot, count in zip(candidates, counts) if count == 1]
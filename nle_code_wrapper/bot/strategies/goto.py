@@ -16,17 +16,12 @@ def goto_closest(bot: "Bot", positions):
     if len(positions) == 0:
         return False
 
-    # Go to the closest position
-    distances = bot.pathfinder.distances(bot.entity.position)
-    closest_position = min(
-        (tuple(pos) for pos in positions if distances.get(tuple(pos), np.inf) < np.inf),
-        key=lambda pos: distances[pos],
-        default=None,
-    )
-    if closest_position is None:
+    # Go to the closest position, a single search finds both the goal and the path to it
+    path = bot.pathfinder.get_path_to_nearest(positions)
+    if path is None:
         return False
 
-    bot.pathfinder.goto(closest_position)
+    bot.pathfinder.goto(path[-1], path=path)
     return True
 
 
@@ -81,13 +76,9 @@ def get_other_features(bot: "Bot", feature_detection):
         feature = np.logical_and(feature, level.walkable)
         # consider rooms which we are not in
         if not label == labeled_features[my_position]:
-            feature_positions = np.argwhere(feature)
-            closest_position = min(
-                (tuple(pos) for pos in feature_positions),
-                key=lambda pos: distances.get(tuple(pos), np.inf),
-                default=None,
-            )
-            unvisited_features.append(closest_position)
+            closest_position = distances.closest(np.argwhere(feature))
+            if closest_position is not None:
+                unvisited_features.append(closest_position)
 
     return np.array(unvisited_features)
 
@@ -164,13 +155,9 @@ def goto_unexplored_feature(bot: "Bot", feature_detection) -> bool:
         feature = np.logical_and(feature, level.walkable)
         # consider only unexplored features
         if not np.any(np.logical_and(feature, level.was_on)):
-            feature_positions = np.argwhere(feature)
-            closest_position = min(
-                (tuple(pos) for pos in feature_positions),
-                key=lambda pos: distances.get(tuple(pos), np.inf),
-                default=None,
-            )
-            unvisited_features.append(closest_position)
+            closest_position = distances.closest(np.argwhere(feature))
+            if closest_position is not None:
+                unvisited_features.append(closest_position)
     unvisited_features = np.array(unvisited_features)
 
     return goto_closest(bot, unvisited_features)
@@ -193,15 +180,9 @@ def descend_stairs(bot: "Bot") -> bool:
     feature = features.get("stairs down", None)
 
     if feature is not None:
-        distances = bot.pathfinder.distances(bot.entity.position)
-        closest_feature = min(
-            (tuple(f) for f in feature if distances.get(tuple(f)) is not None),
-            key=lambda f: distances.get(f, np.inf),
-            default=None,
-        )
-
-        if closest_feature:
-            bot.pathfinder.goto(closest_feature)
+        path = bot.pathfinder.get_path_to_nearest(feature)
+        if path is not None:
+            bot.pathfinder.goto(path[-1], path=path)
             bot.step(A.MiscDirection.DOWN)
             return True
 
@@ -217,21 +198,41 @@ def ascend_stairs(bot: "Bot") -> bool:
     feature = features.get("stairs up", None)
 
     if feature is not None:
-        distances = bot.pathfinder.distances(bot.entity.position)
-        closest_feature = min(
-            (tuple(f) for f in feature if distances.get(tuple(f)) is not None),
-            key=lambda f: distances.get(f, np.inf),
-            default=None,
-        )
-
-        if closest_feature:
-            bot.pathfinder.goto(closest_feature)
+        path = bot.pathfinder.get_path_to_nearest(feature)
+        if path is not None:
+            bot.pathfinder.goto(path[-1], path=path)
             bot.step(A.MiscDirection.UP)
             return True
 
     return False
 
 
+@strategy
+def goto_level(bot: "Bot", dungeon_number: int, level_number: int) -> bool:
+    """
+    Travels to the level over the stairs we know about, possibly through several levels.
+    """
+    moved = False
+    while bot.current_level.key() != (dungeon_number, level_number):
+        route = bot.pathfinder.route_to(dungeon_number, level_number)
+        if not route:
+            return moved
+
+        level, position, action = route[0]
+        path = bot.pathfinder.get_path_to(position)
+        if path is None:
+            return moved
+        bot.pathfinder.goto(position, path=path)
+        bot.step(A.MiscDirection.DOWN if action == ">" else A.MiscDirection.UP)
+        moved = True
+
+        # the stairs didn't take us anywhere, e.g. we are trapped or burdened
+        if bot.current_level.key() == level:
+            return moved
+
+    return moved
+
+
 @strategy
 def goto_room(bot: "Bot") -> bool:
     """Moves the agent to the closest other room (ignores current room)."""
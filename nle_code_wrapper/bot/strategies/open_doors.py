@@ -9,13 +9,11 @@ from nle_code_wrapper.utils import utils
 
 def find_nearest_door(bot: "Bot"):
     closed_doors = np.argwhere(utils.isin(bot.glyphs, G.DOOR_CLOSED))
-    neigbors = [bot.pathfinder.reachable(bot.entity.position, tuple(door), adjacent=True) for door in closed_doors]
-    distances = bot.pathfinder.distances(bot.entity.position)
-    return min(
-        ((neighbor, tuple(door)) for neighbor, door in zip(neigbors, closed_doors) if neighbor is not None),
-        key=lambda pair: distances.get(pair[0], np.inf),
-        default=None,
-    )
+    neighbors, distances = bot.pathfinder.reachable_many(bot.entity.position, closed_doors, adjacent=True)
+    if not np.any(distances >= 0):
+        return None
+    closest = np.argmin(np.where(distances >= 0, distances, np.iinfo(np.int64).max))
+    return tuple(neighbors[closest]), tuple(closed_doors[closest])
 
 
 @strategy
@@ -1,14 +1,13 @@
 import networkx as nx
 import numpy as np
 from nle.nethack import actions as A
-from nle_utils.glyph import G
 from scipy import ndimage, spatial
 
 from nle_code_wrapper.bot import Bot
 from nle_code_wrapper.bot.pathfinder.movements import Movements
 from nle_code_wrapper.bot.strategies.goto import goto_closest
 from nle_code_wrapper.bot.strategy import strategy
-from nle_code_wrapper.utils import utils
+from nle_code_wrapper.utils.glyph_categories import GC, is_category
 from nle_code_wrapper.utils.strategies import (
     corridor_detection,
     label_dungeon_features,
@@ -71,8 +70,8 @@ def find_unsearched_walls(bot: "Bot", search_count_threshold=10):
 
     rooms = labeled_rooms > 0
     corridors = labeled_corridors > 0
-    door_closed = utils.isin(bot.glyphs, G.DOOR_CLOSED)
-    walls = utils.isin(bot.glyphs, G.WALL)
+    door_closed = is_category(bot.categories, GC.DOOR_CLOSED)
+    walls = is_category(bot.categories, GC.WALL)
 
     # Find walls adjacent to walkable tiles in current room
     room_walkable = np.logical_and(rooms, level.walkable)
@@ -180,7 +179,7 @@ def search_room_for_hidden_doors_old(bot: "Bot") -> bool:
 
     # Find walls adjacent to walkable tiles in current room
     room_walkable = np.logical_and(current_room, level.walkable)
-    walls = utils.isin(bot.glyphs, G.WALL)
+    walls = is_category(bot.categories, GC.WALL)
     adjacent_to_walls = np.logical_and(room_walkable, ndimage.binary_dilation(walls))
 
     # Exclude already thoroughly searched walls
@@ -1,15 +1,16 @@
 import itertools
+from collections import defaultdict
 from functools import wraps
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Set, Tuple
 
 import numpy as np
 from nle import nethack
-from nle_utils.glyph import G
 from scipy import ndimage
 
 from nle_code_wrapper.bot.exceptions import BotFinished, BotPanic
+from nle_code_wrapper.bot.level import DISCOVERY_CATEGORIES
 from nle_code_wrapper.bot.pathfinder.movements import Movements
-from nle_code_wrapper.utils import utils
+from nle_code_wrapper.utils.glyph_categories import GC, is_category
 from nle_code_wrapper.utils.strategies import label_dungeon_features, save_boolean_array_pillow
 
 if TYPE_CHECKING:
@@ -89,90 +90,90 @@ def repeat_n_times(n: int):
     return decorator
 
 
+class DeadEnds:
+    """
+    Dead ends of the current level, corridor positions with one or less cardinal neighbors.
+    To confirm a dead end we check if the bot was on the position.
+
+    The positions are checked once when we visit them, and again only when the level, the monsters
+    or our position changed around them.
+    """
+
+    def __init__(self, bot: "Bot") -> None:
+        self.bot = bot
+        self.movements = Movements(bot, cardinal_only=True)
+        self.positions: Set[Tuple[int, int]] = set()
+        self.level = None
+        self.version = None
+        # position in the discoveries of the level, see `Level.discoveries`
+        self.cursor = 0
+        self.occupied: Set[Tuple[int, int]] = set()
+
+    def update(self) -> Set[Tuple[int, int]]:
+        bot = self.bot
+        level = bot.current_level
+        occupied = {entity.position for entity in bot.entities} | {bot.entity.position}
+
+        dirty = level.changed_since(self.version) if level is self.level else None
+        if dirty is None:
+            self.positions = set()
+            candidates = np.argwhere(level.was_on)
+        else:
+            # monsters block the moves around them
+            for position in occupied.symmetric_difference(self.occupied):
+                dirty[position] = True
+            # corridors and the moves of a position depend only on its neighbors
+            dirty = ndimage.binary_dilation(dirty, structure=np.ones((3, 3), bool))
+            visited = [position for kind, position in level.discoveries[self.cursor :] if kind == "visited"]
+            candidates = np.concatenate([np.argwhere(dirty & level.was_on), np.array(visited, np.int64).reshape(-1, 2)])
+
+        self.level, self.version, self.cursor, self.occupied = level, level.version, len(level.discoveries), occupied
+        if len(candidates) == 0:
+            return self.positions
+
+        features, num_rooms, _ = label_dungeon_features(bot)
+        corridors = features[tuple(candidates.T)] > num_rooms
+        num_neighbors = self.movements.neighbor_mask(candidates).sum(axis=1)
+
+        for position, dead_end in zip(map(tuple, candidates.tolist()), corridors & (num_neighbors <= 1)):
+            if dead_end:
+                self.positions.add(position)
+            else:
+                self.positions.discard(position)
+        return self.positions
+
+
 def repeat_until_discovery(func):
     @wraps(func)
     def wrapper(bot: "Bot", *args, **kwargs):
-        def get_labels(features):
+        def still(kind, position):
             """
-            return labels of dungeon part where we are
+            whether the discovered door, item or special object is still there
             """
-            labels, num_labels = ndimage.label(features > 0)
-            current_label = labels == labels[bot.entity.position]
-            return set(np.unique(features[current_label]))
+            return bool(bot.categories[position] & DISCOVERY_CATEGORIES[kind])
 
-        def get_doors():
-            """
-            return positions of the closed doors in the dungeon
-            """
-            return set(map(tuple, np.argwhere(utils.isin(bot.glyphs, G.DOOR_CLOSED))))
-
-        def get_dead_ends(features):
-            """
-            return positions of the dead ends in the dungeon
-            dead end is a position which has on or less cardinal neighbors
-            to confirm dead end we check if bot was on this position
-            """
-            prev_movements = bot.movements
-            bot.movements = Movements(bot, cardinal_only=True)
-            dead_ends = np.array(
-                [
-                    n
-                    for n in np.argwhere(features)
-                    if bot.current_level.was_on[tuple(n)] and len(bot.pathfinder.neighbors(tuple(n))) <= 1
-                ]
-            )
-            bot.movements = prev_movements
-            return set(map(tuple, dead_ends))
-
-        def get_items():
-            """
-            return positions of the items in the dungeon
-            """
-            return set(map(tuple, np.argwhere(utils.isin(bot.glyphs, G.ITEMS))))
-
-        def get_specials():
-            """
-            return positions of the special objects in the dungeon
-            """
-            return set(
-                map(
-                    tuple,
-                    np.argwhere(
-                        utils.isin(bot.glyphs, G.THRONE, G.GRAVE, G.STAIR_DOWN, G.STAIR_UP, G.ALTAR, G.FOUNTAIN, G.SINK)
-                    ),
-                )
-            )
-
-        features, num_rooms, num_corridors = label_dungeon_features(bot)
-        corridors = features > num_rooms
-        labels = get_labels(features)
-        doors = get_doors()
-        dead_ends = get_dead_ends(corridors)
-        items = get_items()
-        specials = get_specials()
-        seen = bot.current_level.seen.copy()
+        # we only look at the discoveries made while exploring, see `Level.discoveries`
+        processed = {id(level): len(level.discoveries) for level in bot.levels.values()}
+        dead_ends = DeadEnds(bot)
+        known_dead_ends = set(dead_ends.update())
 
         while func(bot, *args, **kwargs):
-            new_seen = np.logical_and(np.logical_not(seen), bot.current_level.seen)
-            new_seen = set(map(tuple, np.argwhere(new_seen)))
-
-            # 1) if we have new room of new corridor break
-            new_features, new_num_rooms, new_num_corridors = label_dungeon_features(bot)
-            new_corridors = new_features > new_num_rooms
-            new_labels = get_labels(new_features)
-            if len(labels) < len(new_labels):
-                pass
-                # return True
-
-            # 2) if we have new door break
-            new_doors = get_doors()
-            for door in new_doors.difference(doors).intersection(new_seen):
-                if bot.pathfinder.reachable(bot.entity.position, door, adjacent=True):
-                    return True
-
-            # 3) if we have dead new end break
-            new_dead_ends = get_dead_ends(new_corridors)
-            if new_dead_ends.difference(dead_ends):
+            level = bot.current_level
+            discoveries = level.discoveries[processed.get(id(level), 0) :]
+            processed[id(level)] = len(level.discoveries)
+
+            new = defaultdict(list)
+            for kind, position in discoveries:
+                new[kind].append(position)
+
+            # 1) if we have new door break
+            doors = [door for door in new["door"] if still("door", door)]
+            _, distances = bot.pathfinder.reachable_many(bot.entity.position, doors, adjacent=True)
+            if np.any(distances >= 0):
+                return True
+
+            # 2) if we have dead new end break
+            if dead_ends.update().difference(known_dead_ends):
                 from nle_code_wrapper.bot.strategies.search import search_corridor_for_hidden_doors
 
                 bot_pos = bot.entity.position
@@ -188,17 +189,17 @@ def repeat_until_discovery(func):
                         continue
 
                     p = (bot_pos[0] + dx, bot_pos[1] + dy)
-                    kernel.append(bot.glyphs[p])
+                    kernel.append(bot.categories[p])
 
-                kernel = np.array([kernel])
+                kernel = np.array([kernel], np.uint32)
 
                 # but you shouldn't search if there is a boulder
-                if np.any(utils.isin(kernel, G.BOULDER)):
+                if np.any(is_category(kernel, GC.BOULDER)):
                     bot.add_message("You find a boulder.")
                     return True
 
                 # but you shouldn't search if there are doors
-                elif np.any(utils.isin(kernel, G.DOOR_CLOSED)):
+                elif np.any(is_category(kernel, GC.DOOR_CLOSED)):
                     bot.add_message("You find closed doors.")
                     return True
 
@@ -215,20 +216,12 @@ def repeat_until_discovery(func):
                         # or we are in a dead end
                         return True
 
-            # 4) if we have new items break
-            new_items = get_items()
-            for item in new_items.difference(items).intersection(new_seen):
-                if bot.pathfinder.get_path_to(item):
+            # 3) if we have new items or special objects break
+            for kind in ["item", "special"]:
+                positions = [position for position in new[kind] if still(kind, position)]
+                if positions and bot.pathfinder.get_path_to_nearest(positions) is not None:
                     return True
 
-            # 5) if we have new special objects break
-            new_specials = get_specials()
-            for special in new_specials.difference(specials).intersection(new_seen):
-                if bot.pathfinder.get_path_to(special):
-                    return True
-
-            seen = bot.current_level.seen.copy()
-
         return False
 
     return wrapper
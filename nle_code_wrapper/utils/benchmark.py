@@ -0,0 +1,248 @@
+"""
+Micro-benchmarks of the pathfinding over recorded observations, runs offline without an environment.
+
+Record the snapshots once (needs NLE / MiniHack):
+    python -m nle_code_wrapper.utils.benchmark --record nle_code_wrapper/utils/dat/pathfinding.npz
+
+Benchmark the current code and compare the JSON results across commits:
+    python -m nle_code_wrapper.utils.benchmark --output results.json
+"""
+
+import argparse
+import json
+import subprocess
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from nle import nethack
+
+from nle_code_wrapper.bot.bot import Bot
+from nle_code_wrapper.bot.pathfinder import Movements, Pathfinder
+from nle_code_wrapper.bot.strategies.fight_monster import find_tactical_positions
+
+DEFAULT_SNAPSHOTS = Path(__file__).parent / "dat" / "pathfinding.npz"
+DEFAULT_ENVS = [
+    "MiniHack-Room-Monster-15x15-v0",
+    "MiniHack-CorridorBattle-v0",
+    "MiniHack-Room-Ultimate-15x15-v0",
+    "MiniHack-MazeWalk-15x15-v0",
+    "NetHackChallenge-v0",
+]
+
+
+class SnapshotBot:
+    """
+    Minimal bot built from a single observation, enough for the pathfinder and the movements.
+    """
+
+    current_view = last_view = None
+
+    get_view = Bot.get_view
+    get_blstats = Bot.get_blstats
+    get_glyphs = Bot.get_glyphs
+    get_entity = Bot.get_entity
+    get_entities = Bot.get_entities
+    get_current_level = Bot.get_current_level
+    get_terrain_features = Bot.get_terrain_features
+
+    def __init__(self, glyphs: np.ndarray, blstats: np.ndarray) -> None:
+        obs = {"glyphs": glyphs, "blstats": blstats}
+        self.levels = {}
+        self.inventory = SimpleNamespace(can_squeeze=True)
+
+        self.blstats = self.get_blstats(obs)
+        self.glyphs = self.get_glyphs(obs)
+        self.entity = self.get_entity(obs)
+        self.entities = self.get_entities(obs)
+        self.current_level = self.get_current_level(obs)
+        self.current_level.update(self.glyphs, self.blstats)
+        self.terrain_features = {self.current_level.key(): {"features": self.get_terrain_features(self.glyphs)}}
+        self.reset()
+
+    def reset(self, **kwargs) -> None:
+        """
+        Drops everything the movements and the pathfinder cached.
+        """
+        self.movements = Movements(self, **kwargs)
+        self.pathfinder = Pathfinder(self)
+
+
+def record(path: Path, envs: List[str], steps: int, every: int, episodes: int, seed: int) -> None:
+    """
+    Records glyphs and blstats of random walks in the environments.
+    """
+    import gymnasium as gym
+    import minihack  # noqa: F401 registers the environments
+    import nle  # noqa: F401
+
+    rng = np.random.RandomState(seed)
+    glyphs, blstats, categories = [], [], []
+    for env_name in envs:
+        env = gym.make(env_name)
+        moves = [i for i, action in enumerate(env.unwrapped.actions) if action in nethack.CompassDirection]
+        for episode in range(episodes):
+            obs, _ = env.reset(seed=seed + episode)
+            for step in range(steps):
+                # mostly movements, so we get somewhere
+                action = rng.choice(moves) if rng.rand() < 0.9 else rng.randint(env.action_space.n)
+                obs, _, terminated, truncated, _ = env.step(action)
+                if terminated or truncated:
+                    break
+                if step % every == 0:
+                    glyphs.append(obs["glyphs"].copy())
+                    blstats.append(obs["blstats"].copy())
+                    categories.append(env_name)
+        env.close()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(path, glyphs=np.array(glyphs), blstats=np.array(blstats), categories=np.array(categories))
+
+
+def measure(func: Callable, setup: Callable, repeats: int) -> List[float]:
+    """
+    Times func in seconds, setup runs before every call and is not timed.
+    """
+    times = []
+    for _ in range(repeats):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def benchmark_snapshot(bot: SnapshotBot, repeats: int) -> Dict[str, List[float]]:
+    """
+    Times the pathfinding queries on a single snapshot, every query starts from empty caches
+    except for the movements grid, which is built in the setup.
+    """
+    start = bot.entity.position
+    positions = [entity.position for entity in bot.entities]
+
+    def cold():
+        bot.reset()
+        return ()
+
+    def warm(**kwargs):
+        def setup():
+            bot.reset(**kwargs)
+            bot.pathfinder.create_movements_grid()
+            return ()
+
+        return setup
+
+    # the farthest reachable position, so the path query has some work to do
+    bot.reset()
+    distances = bot.pathfinder.distances(start)
+    goal = max(distances.items(), key=lambda item: item[1], default=(start, 0))[0]
+
+    results = {
+        "create_movements_grid": measure(lambda: bot.pathfinder.create_movements_grid(), cold, repeats),
+        # the networkx view, only used to render the movements
+        "create_movements_graph_networkx": measure(
+            lambda: bot.pathfinder.create_movements_grid().to_networkx(), warm(), repeats
+        ),
+        "distances": measure(lambda: bot.pathfinder.distances(start), warm(), repeats),
+        "get_path_to": measure(lambda: bot.pathfinder.get_path_to(goal), warm(), repeats),
+    }
+    if positions:
+        results["reachable"] = measure(
+            lambda: [bot.pathfinder.reachable(start, position, adjacent=True) for position in positions],
+            warm(),
+            repeats,
+        )
+        results["reachable_many"] = measure(
+            lambda: bot.pathfinder.reachable_many(start, positions, adjacent=True), warm(), repeats
+        )
+        results["find_tactical_positions"] = measure(
+            lambda: find_tactical_positions(bot, bot.entities), warm(monster_collision=False), repeats
+        )
+    return results
+
+
+def summarize(times: List[float]) -> Dict[str, float]:
+    times = np.array(times) * 1e6
+    return {
+        "calls": len(times),
+        "mean_us": float(np.mean(times)),
+        "median_us": float(np.median(times)),
+        "min_us": float(np.min(times)),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(path: Path, repeats: int, warmup: bool = True) -> Dict:
+    """
+    Runs the benchmarks on every recorded snapshot.
+
+    Args:
+        path (Path): snapshots recorded with `record`
+        repeats (int): number of timed calls of every query on every snapshot
+        warmup (bool): run every query once before timing, to exclude numba compilation
+    Returns:
+        Dict: timings summarized per query, for all snapshots and for every category of snapshots
+    """
+    data = np.load(path)
+    times = defaultdict(lambda: defaultdict(list))
+    for glyphs, blstats, category in zip(data["glyphs"], data["blstats"], data["categories"]):
+        bot = SnapshotBot(glyphs, blstats)
+        if warmup:
+            benchmark_snapshot(bot, 1)
+            warmup = False
+        for name, result in benchmark_snapshot(bot, repeats).items():
+            times["all"][name].extend(result)
+            times[str(category)][name].extend(result)
+
+    return {
+        "commit": git_commit(),
+        "snapshots": str(path),
+        "num_snapshots": len(data["glyphs"]),
+        "repeats": repeats,
+        "results": {
+            category: {name: summarize(result) for name, result in results.items()}
+            for category, results in times.items()
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pathfinding micro-benchmarks over recorded snapshots.")
+    parser.add_argument("--snapshots", type=Path, default=DEFAULT_SNAPSHOTS)
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON results here instead of stdout")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--record", type=Path, default=None, help="record new snapshots to this path and exit")
+    parser.add_argument("--envs", nargs="+", default=DEFAULT_ENVS)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--every", type=int, default=10)
+    parser.add_argument("--episodes", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.record is not None:
+        record(args.record, args.envs, args.steps, args.every, args.episodes, args.seed)
+        return
+
+    if not args.snapshots.exists():
+        parser.error(f"no snapshots at {args.snapshots}, record them with --record or pass them with --snapshots")
+
+    results = json.dumps(run(args.snapshots, args.repeats), indent=2)
+    if args.output is None:
+        print(results)
+    else:
+        args.output.write_text(results)
+
+
+if __name__ == "__main__":
+    main()
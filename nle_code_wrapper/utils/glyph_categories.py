@@ -0,0 +1,111 @@
+import enum
+
+import numba as nb
+import numpy as np
+from nle import nethack
+from nle_utils.glyph import SS, G
+from numpy import ndarray
+
+
+class GC(enum.IntFlag):
+    """
+    Glyph categories as bits, a glyph belongs to every category of the glyph sets it is in.
+    """
+
+    MONS = enum.auto()
+    PETS = enum.auto()
+    INVISIBLE_MON = enum.auto()
+    BODIES = enum.auto()
+    OBJECTS = enum.auto()
+    STATUES = enum.auto()
+    ITEMS = enum.auto()
+    BOULDER = enum.auto()
+    FLOOR = enum.auto()
+    STAIR_UP = enum.auto()
+    STAIR_DOWN = enum.auto()
+    DOOR_OPENED = enum.auto()
+    DOOR_CLOSED = enum.auto()
+    DOORS = enum.auto()
+    TRAPS = enum.auto()
+    ALTAR = enum.auto()
+    FOUNTAIN = enum.auto()
+    SINK = enum.auto()
+    THRONE = enum.auto()
+    GRAVE = enum.auto()
+    WALL = enum.auto()
+    BARS = enum.auto()
+    LAVA = enum.auto()
+    WATER = enum.auto()
+    SWALLOW = enum.auto()
+
+
+CATEGORY_GLYPHS = {
+    GC.MONS: G.MONS,
+    GC.PETS: G.PETS,
+    GC.INVISIBLE_MON: G.INVISIBLE_MON,
+    GC.BODIES: G.BODIES,
+    GC.OBJECTS: G.OBJECTS,
+    GC.STATUES: G.STATUES,
+    GC.ITEMS: G.ITEMS,
+    GC.BOULDER: G.BOULDER,
+    GC.FLOOR: G.FLOOR,
+    GC.STAIR_UP: G.STAIR_UP,
+    GC.STAIR_DOWN: G.STAIR_DOWN,
+    GC.DOOR_OPENED: G.DOOR_OPENED,
+    GC.DOOR_CLOSED: G.DOOR_CLOSED,
+    GC.DOORS: G.DOORS,
+    GC.TRAPS: G.TRAPS,
+    GC.ALTAR: G.ALTAR,
+    GC.FOUNTAIN: G.FOUNTAIN,
+    GC.SINK: G.SINK,
+    GC.THRONE: G.THRONE,
+    GC.GRAVE: G.GRAVE,
+    GC.WALL: G.WALL,
+    GC.BARS: G.BARS,
+    GC.LAVA: frozenset({SS.S_lava}),
+    GC.WATER: frozenset({SS.S_water}),
+    GC.SWALLOW: G.SWALLOW,
+}
+
+
+def _category_table() -> ndarray:
+    table = np.zeros(nethack.MAX_GLYPH, np.uint32)
+    for category, glyphs in CATEGORY_GLYPHS.items():
+        table[list(glyphs)] |= np.uint32(category)
+    return table
+
+
+# categories of every glyph
+CATEGORY_TABLE = _category_table()
+
+
+@nb.njit("u4[:,:](i2[:,:],u4[:])", cache=True)
+def _categories_kernel(glyphs, table):
+    ret = np.zeros(glyphs.shape, dtype=np.uint32)
+    for y in range(glyphs.shape[0]):
+        for x in range(glyphs.shape[1]):
+            glyph = glyphs[y, x]
+            if 0 <= glyph < table.shape[0]:
+                ret[y, x] = table[glyph]
+    return ret
+
+
+def glyph_categories(glyphs: ndarray) -> ndarray:
+    """
+    Categories of the glyphs in a single pass, the membership tests are then bitwise ands,
+    e.g. ``is_category(categories, GC.WALL | GC.DOOR_CLOSED)`` instead of ``isin(glyphs, G.WALL, G.DOOR_CLOSED)``.
+
+    Args:
+        glyphs (ndarray): 2D int16 glyphs, invalid glyphs (e.g. -1 of unknown cells) have no category
+    Returns:
+        ndarray: uint32 bits of `GC` of every glyph
+    """
+    assert glyphs.dtype == np.int16
+    return _categories_kernel(glyphs, CATEGORY_TABLE)
+
+
+def is_category(categories: ndarray, category: GC) -> ndarray:
+    """
+    Boolean mask of the cells in any of the categories.
+    """
+    return (categories & np.uint32(category)) != 0
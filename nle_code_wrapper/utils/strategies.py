@@ -1,5 +1,5 @@
-import itertools
-from typing import TYPE_CHECKING, Tuple
+from collections import namedtuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
 import numpy as np
 from nle_utils.glyph import SS, G
@@ -62,94 +62,130 @@ def save_boolean_array_pillow(arr):
         print(f"Error saving image: {e}")
 
 
-def label_dungeon_features(bot: "Bot"):
+ROOM_FLOOR = frozenset({SS.S_room, SS.S_darkroom})
+CORRIDOR_FLOOR = frozenset({SS.S_corr, SS.S_litcorr})
+DOOR_FLOOR = frozenset({SS.S_ndoor}) | G.DOOR_OPENED
+
+# labeled rooms and corridors of a level at its version, cached on the level, see `label_dungeon_features`
+DungeonFeatures = namedtuple(
+    "DungeonFeatures",
+    [
+        "version",
+        "rooms",
+        "corridors",
+        "labeled_rooms",
+        "labeled_corridors",
+        "labeled_features",
+        "num_rooms",
+        "num_corridors",
+    ],
+)
+
+
+def dungeon_feature_masks(objects: np.ndarray, walkable: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Labels the dungeon features (rooms, corridors, and doors) in the current level of the bot.
+    Rooms and corridors of the level (or a part of it), based on the remembered floor.
+
     Args:
-        bot (Bot): The bot instance containing the current level and entity position.
+        objects (np.ndarray): remembered glyphs of the level
+        walkable (np.ndarray): walkable positions of the level
     Returns:
-        tuple: A tuple containing:
-            - labeled_features (np.ndarray): An array with labeled rooms and corridors.
-            - num_rooms (int): The number of labeled rooms.
-            - num_corridors (int): The number of labeled corridors.
+        Tuple[np.ndarray, np.ndarray]: boolean masks of the rooms and the corridors, doors are part of the corridors
     """
-    level = bot.current_level
-    structure = ndimage.generate_binary_structure(2, 1)
+    rooms = utils.isin(objects, ROOM_FLOOR)
+    corridors = utils.isin(objects, CORRIDOR_FLOOR)
+    doors = utils.isin(objects, DOOR_FLOOR)
+
+    # missing features (items, corpses, monsters, chests, etc.), this includes our position,
+    # are corridors when any of their neighbors is a corridor and rooms when they have only room neighbors
+    unlabeled = walkable & ~rooms & ~corridors
+    neighborhood = np.ones((3, 3), bool)
+    near_rooms = ndimage.binary_dilation(rooms, structure=neighborhood)
+    near_corridors = ndimage.binary_dilation(corridors, structure=neighborhood)
+    corridors |= unlabeled & near_corridors
+    rooms |= unlabeled & near_rooms & ~near_corridors
 
-    # rooms
-    room_floor = frozenset({SS.S_room, SS.S_darkroom})
-    rooms = utils.isin(level.objects, room_floor)
-    labeled_rooms, num_rooms = ndimage.label(rooms, structure=structure)
+    # we include doors only at the end to be able to detect if we are standing on the door, overall we treat doors as part of the corridor
+    corridors[doors] = True
+    rooms[doors] = False  # we have to exclude doors from rooms as well, because we could stand on the door
 
-    # corridors
-    corridor_floor = frozenset({SS.S_corr, SS.S_litcorr})
-    corridors = utils.isin(level.objects, corridor_floor)
-    labeled_corridors, num_corridors = ndimage.label(corridors, structure=structure)
+    return rooms, corridors
 
-    # doors
-    doors = utils.isin(level.objects, frozenset({SS.S_ndoor}), G.DOOR_OPENED)
 
-    # combine rooms and corridors
-    labeled_features = np.zeros_like(level.objects)
-    labeled_features[rooms] = labeled_rooms[rooms]
-    labeled_features[corridors] = labeled_corridors[corridors] + num_rooms
+def _label_dungeon_features(level, cached: Optional[DungeonFeatures]) -> DungeonFeatures:
+    from nle_code_wrapper.bot.pathfinder.grid import bounding_window, grow_window
 
-    def label_walkable_features(position):
-        # if all neighbors which are dungeon features have the same label
-        neighbors = []
-        height, width = bot.glyphs.shape
-        for x, y in itertools.product([-1, 0, 1], repeat=2):
-            if x == 0 and y == 0:
-                continue
-
-            # make sure we don't have out of bounds
-            if not (0 <= position[0] + y < height) or not (0 <= position[1] + x < width):
-                continue
-
-            neighbor = labeled_features[position[0] + y, position[1] + x]
-            if neighbor != 0:
-                neighbors.append(neighbor)
-        neighbors = np.array(neighbors)
-
-        if len(neighbors) > 0:
-            # if all neighbors are rooms or corridors
-            if np.all(neighbors <= num_rooms):
-                rooms[position] = True
-            else:
-                corridors[position] = True
-
-    # missing features (items, corpses, monsters, chests, etc.)
-    # this includes our position
-    for p in np.argwhere(np.logical_and(level.walkable, labeled_features == 0)):
-        label_walkable_features(tuple(p))
+    dirty = None if cached is None else level.changed_since(cached.version)
+    if dirty is None:
+        rooms, corridors = dungeon_feature_masks(level.objects, level.walkable)
+    else:
+        # the masks of the positions depend only on their neighbors, recompute them around the changes
+        rooms, corridors = cached.rooms.copy(), cached.corridors.copy()
+        window = bounding_window(dirty, margin=1)
+        if window is not None:
+            outer, inner = grow_window(window, 1, level.objects.shape)
+            window_rooms, window_corridors = dungeon_feature_masks(level.objects[outer], level.walkable[outer])
+            rooms[window] = window_rooms[inner]
+            corridors[window] = window_corridors[inner]
+
+    # only the kinds of features which changed are labeled again
+    structure = ndimage.generate_binary_structure(2, 1)
+    if cached is not None and np.array_equal(rooms, cached.rooms):
+        rooms, labeled_rooms, num_rooms = cached.rooms, cached.labeled_rooms, cached.num_rooms
+    else:
+        labeled_rooms, num_rooms = ndimage.label(rooms, structure=structure)
+    if cached is not None and np.array_equal(corridors, cached.corridors):
+        corridors, labeled_corridors, num_corridors = cached.corridors, cached.labeled_corridors, cached.num_corridors
+    else:
+        labeled_corridors, num_corridors = ndimage.label(corridors, structure=structure)
 
-    # we include doors only at the end to be able to detect if we are standing on the door, overall we treat doors as part of the corridor
-    corridors[doors] = True
-    rooms[doors] = False  # we have to exclude doors from rooms as well, because we could stand on the door
+    if cached is not None and labeled_rooms is cached.labeled_rooms and labeled_corridors is cached.labeled_corridors:
+        return cached._replace(version=level.version)
 
-    labeled_rooms, num_rooms = ndimage.label(rooms, structure=structure)
-    labeled_corridors, num_corridors = ndimage.label(corridors, structure=structure)
     labeled_features = np.zeros_like(level.objects)
     labeled_features[rooms] = labeled_rooms[rooms]
     labeled_features[corridors] = labeled_corridors[corridors] + num_rooms
+    for array in (rooms, corridors, labeled_rooms, labeled_corridors, labeled_features):
+        array.flags.writeable = False
+
+    return DungeonFeatures(
+        level.version, rooms, corridors, labeled_rooms, labeled_corridors, labeled_features, num_rooms, num_corridors
+    )
+
+
+def label_dungeon_features(bot: "Bot"):
+    """
+    Labels the dungeon features (rooms, corridors, and doors) in the current level of the bot.
+    The labels are cached on the level and updated around the changed positions when the level changes,
+    the returned array is read-only.
 
-    return labeled_features, num_rooms, num_corridors
+    Args:
+        bot (Bot): The bot instance containing the current level and entity position.
+    Returns:
+        tuple: A tuple containing:
+            - labeled_features (np.ndarray): An array with labeled rooms and corridors.
+            - num_rooms (int): The number of labeled rooms.
+            - num_corridors (int): The number of labeled corridors.
+    """
+    level = bot.current_level
+    cached = level.dungeon_features
+    if cached is None or cached.version != level.version:
+        cached = level.dungeon_features = _label_dungeon_features(level, cached)
+    return cached.labeled_features, cached.num_rooms, cached.num_corridors
 
 
 def room_detection(bot: "Bot") -> Tuple[np.ndarray, int]:
     labeled_features, num_rooms, num_corridors = label_dungeon_features(bot)
-    labeled_features[labeled_features > num_rooms] = 0
+    labeled_rooms = np.where(labeled_features > num_rooms, 0, labeled_features)
 
-    return labeled_features, num_rooms
+    return labeled_rooms, num_rooms
 
 
 def corridor_detection(bot: "Bot") -> Tuple[np.ndarray, int]:
     labeled_features, num_rooms, num_corridors = label_dungeon_features(bot)
-    labeled_features[labeled_features <= num_rooms] = 0
-    labeled_features -= num_rooms
-    labeled_features[labeled_features < 0] = 0
+    labeled_corridors = np.where(labeled_features > num_rooms, labeled_features - num_rooms, 0)
 
-    return labeled_features, num_corridors
+    return labeled_corridors, num_corridors
 
 
 def features_detection(bot: "Bot") -> Tuple[np.ndarray, int, int]:
@@ -1,3 +1,4 @@
+import copy
 import os
 import pickle
 import traceback
@@ -34,7 +35,8 @@ class SaveOnException(gym.Wrapper):
             self.save_to_file(message=message)
 
             bot = self.env.get_wrapper_attr("bot")
-            obs = bot.last_obs
+            # the last observation is only valid until the bot takes its next steps
+            obs = copy.deepcopy(bot.last_obs)
             info = bot.last_info
             info["end_status"] = NLE.StepStatus.ABORTED
 
@@ -59,7 +61,8 @@ class SaveOnException(gym.Wrapper):
                 self.remove_file()
 
             bot = self.env.get_wrapper_attr("bot")
-            obs = bot.last_obs
+            # the last observation is only valid until the bot takes its next steps
+            obs = copy.deepcopy(bot.last_obs)
             info = bot.last_info
             info["end_status"] = NLE.StepStatus.ABORTED
 
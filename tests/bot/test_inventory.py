@@ -1,6 +1,9 @@
+import dataclasses
+
+import numpy as np
 import pytest
 
-from nle_code_wrapper.bot.inventory import Item, ItemDatabase, ItemParser
+from nle_code_wrapper.bot.inventory import Inventory, Item, ItemDatabase, ItemParser
 
 
 @pytest.fixture
@@ -16,7 +19,7 @@ def item_database():
 @pytest.fixture
 def get_item(item_parser, item_database):
     def _get_item(text):
-        properties = item_parser(text)
+        properties = dict(item_parser(text))
         if properties["item_category"] is None:
             properties["item_category"] = item_database[properties["name"]].item_category
 
@@ -288,3 +291,74 @@ def test_special(get_item, text):
 )
 def test_artifacts(get_item, text):
     get_item(text)
+
+
+def update_inventory(inventory, items, item_database):
+    inv_strs = np.zeros((55, 80), np.uint8)
+    inv_letters = np.zeros(55, np.uint8)
+    for i, (letter, text) in enumerate(items.items()):
+        inv_strs[i, : len(text)] = list(text.encode("latin-1"))
+        inv_letters[i] = ord(letter)
+    inventory.update(inv_strs, inv_letters, None, None, item_database)
+
+
+def test_inventory_weight(item_database):
+    def update(inventory, items):
+        update_inventory(inventory, items, item_database)
+
+    inventory = Inventory()
+    update(inventory, {"a": "a long sword", "b": "a plate mail"})
+    assert inventory.weight == 490
+    assert inventory.can_squeeze
+
+    update(inventory, {"a": "a long sword", "b": "a plate mail", "c": "a mace"})
+    assert inventory.weight == 520
+
+    update(inventory, {"a": "a long sword", "b": "a plate mail", "c": "a pick-axe"})
+    assert inventory.weight == 590
+
+    update(inventory, {"b": "a plate mail", "c": "a pick-axe", "d": "a fauchard"})
+    assert inventory.weight == 610
+    assert not inventory.can_squeeze
+
+
+def test_inventory_parses_changed_rows(item_database):
+    inventory = Inventory()
+    parsed = []
+    item_parser = inventory.item_parser
+    inventory.item_parser = lambda text: parsed.append(text) or item_parser(text)
+
+    update_inventory(inventory, {"a": "a long sword", "b": "a plate mail"}, item_database)
+    assert parsed == ["a long sword", "a plate mail"]
+
+    # nothing changed
+    update_inventory(inventory, {"a": "a long sword", "b": "a plate mail"}, item_database)
+    assert len(parsed) == 2
+
+    # only the changed and the new rows are parsed
+    update_inventory(inventory, {"a": "a rusty long sword", "b": "a plate mail", "c": "a mace"}, item_database)
+    assert parsed[2:] == ["a rusty long sword", "a mace"]
+    assert inventory.items[ord("a")].text == "a rusty long sword"
+
+    # items moved to another row keep their letter
+    update_inventory(inventory, {"b": "a plate mail", "c": "a mace"}, item_database)
+    assert len(parsed) == 4
+    assert sorted(inventory.items) == [ord("b"), ord("c")]
+
+
+def test_item_parser_cache():
+    ItemParser.cache_clear()
+    first = ItemParser()("a blessed +1 long sword (weapon in hand)")
+    second = ItemParser()("a blessed +1 long sword (weapon in hand)")
+    assert first is second
+    assert ItemParser.cache_info()["hits"] == 1
+    assert ItemParser.cache_info()["misses"] == 1
+
+    # cached results are shared, they can't be modified
+    with pytest.raises(TypeError):
+        first["name"] = "mace"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first["enchantment"].value = 2
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first["quantity"].value = 2
+    assert dict(first) == ItemParser().parse("a blessed +1 long sword (weapon in hand)")
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+import numpy as np
+from nle_utils.glyph import SS, G
+
+from nle_code_wrapper.bot.level import Level
+
+
+def test_penalties():
+    level = Level(0, 1)
+    window = (slice(0, 3), slice(0, 4))
+
+    shop = np.zeros(level.walkable.shape, np.int32)
+    shop[1, 1:3] = 20
+    level.set_penalty("shop", shop)
+    assert level.version == 1
+    assert level.changed_since(0).sum() == 2
+
+    danger = np.zeros(level.walkable.shape, np.int32)
+    danger[1, 2] = 100
+    level.set_penalty("danger", danger)
+    assert level.penalty_costs(window)[1].tolist() == [0, 20, 100, 0]
+
+    level.remove_penalty("danger")
+    assert level.penalty_costs(window)[1].tolist() == [0, 20, 20, 0]
+    assert level.changed_since(2).sum() == 1
+
+    # nothing changes, nothing to invalidate
+    level.set_penalty("shop", shop)
+    assert level.version == 3
+
+
+def test_cost_layer():
+    level = Level(0, 1)
+    level.objects[0, :3] = [SS.S_lava, SS.S_water, SS.S_room]
+    level.known_traps[1, 0] = SS.S_arrow_trap
+
+    window = (slice(0, 2), slice(0, 3))
+    lava = level.cost_layer(level.objects, {frozenset({SS.S_lava}): 100, frozenset({SS.S_water}): 10}, window)
+    assert lava.tolist() == [[100, 10, 0], [0, 0, 0]]
+    traps = level.cost_layer(level.known_traps, {G.TRAPS: 1000}, window)
+    assert traps.tolist() == [[0, 0, 0], [1000, 0, 0]]
+
+
+def test_update():
+    level = Level(0, 1)
+    glyphs = np.full(level.walkable.shape, SS.S_stone, np.int16)
+    glyphs[1, 1:4] = SS.S_room
+    glyphs[1, 4] = SS.S_vwall
+    glyphs[2, 1] = SS.S_fountain
+    blstats = SimpleNamespace(y=1, x=1)
+
+    update = level.update(glyphs, blstats)
+    assert update.changed.sum() == 5
+    assert update.walkable_changed and update.features_changed
+    assert level.walkable[1, 1:4].all() and not level.walkable[1, 4]
+    assert level.was_on[1, 1]
+    assert level.version == 1
+
+    # monsters don't change the remembered terrain
+    glyphs[1, 2] = min(G.MONS)
+    update = level.update(glyphs, blstats)
+    assert not update.changed.any() and not update.features_changed
+    assert level.objects[1, 2] == SS.S_room
+    assert level.version == 1
+
+    # nothing is visible while we are engulfed
+    engulfed = np.full(level.walkable.shape, min(G.SWALLOW), np.int16)
+    update = level.update(engulfed, SimpleNamespace(y=5, x=5))
+    assert not update.changed.any()
+    assert not level.seen[5, 5] and not level.was_on[5, 5]
+
+
+def test_frontier():
+    level = Level(0, 1)
+    glyphs = np.full(level.walkable.shape, SS.S_stone, np.int16)
+    glyphs[1, 3] = glyphs[2, 2] = glyphs[3, 1] = SS.S_room
+
+    # we see the diagonal of a dark room
+    level.update(glyphs, SimpleNamespace(y=2, x=2))
+    assert sorted(map(tuple, np.argwhere(level.frontier))) == [(1, 3), (3, 1)]
+
+    # walking to a position removes it from the frontier, seeing the rest of the room empties it
+    level.update(glyphs, SimpleNamespace(y=1, x=3))
+    assert sorted(map(tuple, np.argwhere(level.frontier))) == [(3, 1)]
+    glyphs[0:5, 0:5] = SS.S_vwall
+    glyphs[1:4, 1:4] = SS.S_room
+    level.update(glyphs, SimpleNamespace(y=1, x=3))
+    assert not level.frontier.any()
+
+
+def test_discoveries():
+    level = Level(0, 1)
+    glyphs = np.full(level.walkable.shape, SS.S_stone, np.int16)
+    glyphs[1, 1:4] = SS.S_room
+    glyphs[1, 4] = SS.S_vcdoor
+    glyphs[1, 2] = min(G.OBJECTS)
+    blstats = SimpleNamespace(y=1, x=1)
+
+    level.update(glyphs, blstats)
+    assert sorted(level.discoveries) == [("door", (1, 4)), ("item", (1, 2)), ("visited", (1, 1))]
+
+    # only what we see or visit for the first time is discovered
+    glyphs[1, 3] = min(G.OBJECTS)
+    glyphs[2, 1] = SS.S_fountain
+    level.update(glyphs, SimpleNamespace(y=1, x=3))
+    assert level.discoveries[3:] == [("special", (2, 1)), ("visited", (1, 3))]
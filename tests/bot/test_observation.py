@@ -0,0 +1,91 @@
+import numpy as np
+from nle import nethack
+
+from nle_code_wrapper.bot.observation import ObservationBuffer, ObservationChanges, StepView
+
+
+class TestObservationBuffer:
+    def test_snapshot(self):
+        obs = {"glyphs": np.zeros((3, 3), np.int16), "blstats": np.arange(4), "tty_chars": np.zeros(2, np.uint8)}
+        buffer = ObservationBuffer()
+
+        first = buffer.snapshot(obs)
+        # the environment updates the arrays in place
+        obs["glyphs"][0, 0] = 1
+        obs["blstats"][:] = 7
+        obs["tty_chars"][0] = 1
+        assert first["glyphs"][0, 0] == 0 and first["blstats"].tolist() == [0, 1, 2, 3]
+        assert first["tty_chars"][0] == 0
+
+        second = buffer.snapshot(obs)
+        obs["glyphs"][0, 0] = 2
+        assert first["glyphs"][0, 0] == 0 and second["glyphs"][0, 0] == 1
+
+        # slots are reused in turns
+        third = buffer.snapshot(obs)
+        assert third["glyphs"] is first["glyphs"] and third["glyphs"][0, 0] == 2
+        assert second["glyphs"][0, 0] == 1
+
+    def test_snapshot_keys(self):
+        obs = {"glyphs": np.zeros((3, 3), np.int16), "tty_chars": np.zeros(2, np.uint8), "text_message": "hello"}
+        snapshot = ObservationBuffer(keys=("glyphs",)).snapshot(obs)
+        assert snapshot["glyphs"] is not obs["glyphs"]
+        # keys which are not buffered are shared
+        assert snapshot["tty_chars"] is obs["tty_chars"] and snapshot["text_message"] == "hello"
+
+
+class TestStepView:
+    def make_obs(self):
+        glyphs = np.full((21, 79), nethack.GLYPH_CMAP_OFF, np.int16)
+        glyphs[5, 10] = nethack.GLYPH_MON_OFF  # player
+        glyphs[6, 12] = nethack.GLYPH_MON_OFF + 1
+        blstats = np.zeros(nethack.BLSTATS_SHAPE, np.int64)
+        blstats[nethack.NLE_BL_X], blstats[nethack.NLE_BL_Y] = 10, 5
+        blstats[nethack.NLE_BL_DNUM], blstats[nethack.NLE_BL_DLEVEL] = 0, 1
+        return {"glyphs": glyphs, "blstats": blstats}
+
+    def test_fields(self):
+        view = StepView(self.make_obs())
+        assert view.entity.position == (5, 10)
+        assert [entity.position for entity in view.entities] == [(6, 12)]
+        assert view.level_key == (0, 1)
+        # computed once
+        assert view.entities is view.entities and view.blstats is view.blstats
+
+    def test_carry(self):
+        obs = self.make_obs()
+        view = StepView(obs)
+        entities = view.entities
+
+        last_obs = ObservationBuffer().snapshot(obs)
+        last_view = view.carry(last_obs)
+        # the environment updates the observation in place
+        obs["glyphs"][6, 12] = nethack.GLYPH_CMAP_OFF
+        obs["blstats"][nethack.NLE_BL_X] = 11
+
+        assert last_view.obs is last_obs and view.obs is obs
+        assert last_view.entities is entities
+        # fields which were not computed yet come from the snapshot
+        assert last_view.entity.position == (5, 10)
+
+
+class TestObservationChanges:
+    def test_changed(self):
+        obs = {"glyphs": np.zeros((3, 3), np.int16), "blstats": np.arange(4), "tty_chars": np.zeros(2, np.uint8)}
+        changes = ObservationChanges()
+
+        assert changes.changed("level", obs, ("glyphs", "blstats"))
+        assert not changes.changed("level", obs, ("glyphs", "blstats"))
+        # every subsystem tracks its own changes
+        assert changes.changed("inventory", obs, ("blstats",))
+
+        # the environment updates the arrays in place
+        obs["tty_chars"][0] = 1
+        assert not changes.changed("level", obs, ("glyphs", "blstats"))
+        obs["glyphs"][1, 1] = 5
+        assert changes.changed("level", obs, ("glyphs", "blstats"))
+        assert not changes.changed("level", obs, ("glyphs", "blstats"))
+        assert not changes.changed("inventory", obs, ("blstats",))
+
+        changes.reset()
+        assert changes.changed("level", obs, ("glyphs", "blstats"))
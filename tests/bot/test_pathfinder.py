@@ -0,0 +1,299 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from nle_utils.glyph import SS
+
+from nle_code_wrapper.bot.level import Level
+from nle_code_wrapper.bot.pathfinder.grid import MovementGrid, bounding_window, build_move_mask, grow_window
+from nle_code_wrapper.bot.pathfinder.levels import LevelGraph
+
+
+def parse_map(text):
+    """
+    '.' walkable, '+' door (no diagonal movements), '#' trap (walkable, expensive), '@' start, anything else is a wall
+    """
+    rows = [list(row) for row in text.strip("\n").split("\n")]
+    chars = np.array(rows)
+    passable = np.isin(chars, [".", "+", "#", "@"])
+    doors = chars == "+"
+    traps = chars == "#"
+    start = tuple(np.argwhere(chars == "@")[0])
+    return passable, doors, traps, start
+
+
+def make_grid(text, diagonal=True):
+    passable, doors, traps, start = parse_map(text)
+    moves = build_move_mask(passable, doors, diagonal=diagonal)
+    costs = np.ones(passable.shape, np.int32)
+    costs[traps] = 1000
+    return MovementGrid(moves, costs, start)
+
+
+SIMPLE_MAP = """
+|||||||||
+|@......|
+|.|||||.|
+|.|...+.|
+|||.|||||
+|||||||.|
+"""
+
+
+class TestMovementGrid:
+    def test_component(self):
+        grid = make_grid(SIMPLE_MAP)
+        assert (1, 1) in grid
+        assert (3, 3) in grid
+        # isolated cell
+        assert (5, 7) not in grid
+        # walls and out of bounds
+        assert (0, 0) not in grid
+        assert (-1, 3) not in grid
+
+    @pytest.mark.parametrize(
+        "diagonal,goal,expected",
+        [
+            (True, (1, 7), 6),
+            (True, (3, 7), 7),
+            (False, (3, 7), 8),
+            # we cannot enter the door diagonally
+            (True, (3, 5), 9),
+        ],
+    )
+    def test_distances(self, diagonal, goal, expected):
+        grid = make_grid(SIMPLE_MAP, diagonal=diagonal)
+        distances = grid.distances((1, 1))
+        assert distances[goal] == expected
+        assert (5, 7) not in distances
+
+    def test_distances_outside(self):
+        grid = make_grid(SIMPLE_MAP)
+        assert grid.distances((5, 7)) == {}
+
+    def test_shortest_path_avoids_traps(self):
+        grid = make_grid("""
+|||||||
+|@.#..|
+|.|||.|
+|.....|
+|||||||
+""")
+        path = grid.shortest_path((1, 1), (1, 5))
+        assert path[0] == (1, 1) and path[-1] == (1, 5)
+        assert (1, 3) not in path
+        assert all(max(abs(a - c), abs(b - d)) == 1 for (a, b), (c, d) in zip(path, path[1:]))
+
+    def test_shortest_path_unreachable(self):
+        grid = make_grid(SIMPLE_MAP)
+        assert grid.shortest_path((1, 1), (5, 7)) is None
+        assert grid.shortest_path((1, 1), (1, 1)) == [(1, 1)]
+
+    def test_first_blocked(self):
+        grid = make_grid(SIMPLE_MAP)
+        path = grid.shortest_path((1, 1), (3, 7))
+        assert grid.first_blocked(path) is None
+
+        # we cannot move east from (1, 3) anymore
+        grid.moves[1, 3] &= ~np.uint8(1 << 3)
+        assert grid.first_blocked(path) == 2
+        assert grid.first_blocked(path, steps=2) is None
+        # not a path
+        assert grid.first_blocked([(1, 1), (1, 3)]) == 0
+
+    def test_networkx_view(self):
+        grid = make_grid(SIMPLE_MAP)
+        graph = grid.to_networkx()
+        assert graph.number_of_nodes() == grid.component.sum()
+        positions = {data["positions"] for _, data in graph.nodes(data=True)}
+        assert (1, 1) in positions and (5, 7) not in positions
+
+    def test_update_window(self):
+        grid = make_grid(SIMPLE_MAP)
+        passable, doors, traps, start = parse_map(SIMPLE_MAP)
+
+        # open a passage to the isolated cell
+        passable[4, 7] = True
+        dirty = np.zeros_like(passable)
+        dirty[4, 7] = True
+
+        window = bounding_window(dirty, margin=1)
+        outer, inner = grow_window(window, 1, passable.shape)
+        moves = build_move_mask(passable[outer], doors[outer])[inner]
+        grid.update(window, moves, np.ones(moves.shape, np.int32), start)
+
+        expected = build_move_mask(passable, doors)
+        assert (grid.moves == expected).all()
+        assert (5, 7) in grid
+
+    def test_distance_field(self):
+        grid = make_grid(SIMPLE_MAP)
+        field = grid.distances((1, 1))
+
+        # the same search is shared until the grid changes
+        assert grid.distances((1, 1)) is field
+        assert field.get((1, 7)) == 6
+        assert field.get((5, 7)) is None
+        assert field.get(None) is None
+        assert (3, 3) in field and (0, 0) not in field
+        assert len(field) == len(dict(field.items()))
+
+        assert field.closest([(5, 7), (3, 7), (1, 3)]) == (1, 3)
+        assert field.closest([(5, 7), (0, 0)]) is None
+
+        path = field.path_to((3, 7))
+        assert path[0] == (1, 1) and path[-1] == (3, 7)
+        assert len(path) == field[(3, 7)] + 1
+        assert field.path_to((5, 7)) is None
+
+    def test_closest_around(self):
+        grid = make_grid(SIMPLE_MAP)
+        field = grid.distances((1, 1))
+
+        positions = np.array([(3, 6), (4, 7), (0, 0)])
+        valid = np.ones((3, 8), bool)
+        valid[0, 3] = False
+        closest, distances = field.closest_around(positions, valid)
+        # (3, 7) next to the door is not considered, the wall (4, 7) is approached from (3, 7)
+        assert closest.tolist() == [[2, 7], [3, 7], [1, 1]]
+        assert distances.tolist() == [6, 7, 0]
+
+        closest, distances = field.closest_around(np.array([(5, 7)]), np.zeros((1, 8), bool))
+        assert closest.tolist() == [[-1, -1]] and distances.tolist() == [-1]
+
+    def test_nearest_path(self):
+        grid = make_grid(SIMPLE_MAP)
+
+        path = grid.nearest_path((1, 1), [(5, 7), (3, 7), (1, 3)])
+        assert path == [(1, 1), (1, 2), (1, 3)]
+        assert grid.nearest_path((1, 1), [(5, 7), (0, 0)]) is None
+        assert grid.nearest_path((1, 1), []) is None
+
+        # goals given as a mask, the closest one by cost is picked
+        goals = np.zeros(grid.moves.shape, bool)
+        goals[3, 3] = goals[3, 7] = True
+        path = grid.nearest_path((1, 1), goals)
+        assert path[-1] == (3, 7) and len(path) == 8
+
+    def test_nearest_path_avoids_traps(self):
+        grid = make_grid("""
+|||||||
+|@#...|
+|.|||.|
+|.....|
+|||||||
+""")
+        # the trap is the closest goal in steps but not in cost
+        path = grid.nearest_path((1, 1), [(1, 2), (3, 3)])
+        assert path[-1] == (3, 3)
+
+    @pytest.mark.parametrize("diagonal", [True, False])
+    def test_shortest_path_matches_dijkstra(self, diagonal):
+        grid = make_grid(
+            """
+||||||||||
+|@..#....|
+|.||#||..|
+|...#....|
+|||.||||.|
+|........|
+||||||||||
+""",
+            diagonal=diagonal,
+        )
+
+        def path_cost(path):
+            return sum(int(grid.costs[p]) for p in path[1:])
+
+        for goal in [(1, 8), (3, 5), (5, 8), (1, 4)]:
+            assert path_cost(grid.shortest_path((1, 1), goal)) == path_cost(grid.nearest_path((1, 1), [goal]))
+
+    def test_shortest_path_bounds(self):
+        grid = make_grid(SIMPLE_MAP)
+        assert len(grid.shortest_path((1, 1), (3, 7), max_cost=7)) == 8
+        assert grid.shortest_path((1, 1), (3, 7), max_cost=6) is None
+        assert grid.shortest_path((1, 1), (3, 7), max_expansions=3) is None
+
+    def test_articulation_points(self):
+        grid = make_grid(SIMPLE_MAP)
+        choke_points = {tuple(p) for p in np.argwhere(grid.articulation_points()).tolist()}
+        # every corridor cell except the dead ends, (3, 4) is connected to (3, 3) only diagonally
+        assert (1, 2) in choke_points and (3, 6) in choke_points and (3, 4) in choke_points
+        assert (1, 1) not in choke_points and (4, 3) not in choke_points
+        assert grid.articulation_points() is grid.articulation_points()
+
+    def test_approach_counts(self):
+        text = """
+|||||||||
+|@..|...|
+|...+...|
+|...|...|
+|||||||||
+"""
+        grid = make_grid(text)
+        passable, _, _, _ = parse_map(text)
+        # monster in the right room, next to the doorway it can only come through the doorway
+        counts = grid.approach_counts([(2, 3), (2, 4), (2, 2)], [(2, 6)], passable)
+        assert counts.tolist() == [1, 3, 8]
+        assert grid.approach_counts([(2, 3)], [(2, 6)], passable, diagonal=False).tolist() == [1]
+
+
+class TestLevelGraph:
+    def make_bot(self):
+        levels = {}
+        terrain_features = {}
+        for level_number, (up, down) in enumerate([(None, (1, 8)), ((1, 2), (3, 5)), ((3, 1), None)], start=1):
+            level = Level(0, level_number)
+            level.walkable[1:4, 1:9] = True
+            features = {}
+            if up is not None:
+                level.objects[up] = SS.S_upstair
+                features["stairs up"] = np.array([up])
+            if down is not None:
+                level.objects[down] = SS.S_dnstair
+                features["stairs down"] = np.array([down])
+            levels[level.key()] = level
+            terrain_features[level.key()] = {"features": features}
+
+        bot = SimpleNamespace(levels=levels, terrain_features=terrain_features)
+        bot.current_level = levels[(0, 1)]
+        bot.entity = SimpleNamespace(position=(1, 1))
+        bot.pathfinder = SimpleNamespace(distances=lambda pos: {(1, 8): 7})
+        return bot
+
+    def test_route(self):
+        bot = self.make_bot()
+        graph = LevelGraph(bot)
+        graph.update()
+
+        assert graph.route((0, 1)) == []
+        assert graph.route((0, 3)) == [((0, 1), (1, 8), ">"), ((0, 2), (3, 5), ">")]
+        # we don't know the stairs down of the last level we visited
+        assert graph.route((0, 4)) is None
+        assert graph.route((1, 1)) is None
+
+    def test_links(self):
+        bot = self.make_bot()
+        graph = LevelGraph(bot)
+        graph.update()
+
+        # we went down the stairs and arrived somewhere else than the stairs up we know about
+        bot.entity.position = (1, 8)
+        graph.update()
+        bot.current_level = bot.levels[(0, 2)]
+        bot.entity.position = (2, 2)
+        graph.update()
+        assert graph.links[((0, 1), (1, 8))] == ((0, 2), (2, 2))
+
+        bot.pathfinder = SimpleNamespace(distances=lambda pos: {(1, 2): 1, (3, 5): 3})
+        assert graph.route((0, 1)) == [((0, 2), (2, 2), "<")]
+
+        # we went up other stairs and don't know what we arrived on yet, they lead down
+        bot.entity.position = (1, 2)
+        graph.update()
+        bot.current_level = bot.levels[(0, 1)]
+        bot.entity.position = (3, 3)
+        graph.update()
+        assert graph.stairs((0, 1))[(3, 3)] == ">"
+        bot.pathfinder = SimpleNamespace(distances=lambda pos: {(3, 3): 0, (1, 8): 7})
+        assert graph.route((0, 2)) == [((0, 1), (3, 3), ">")]
@@ -1,9 +1,12 @@
+from types import SimpleNamespace
+
 import numpy as np
 import pytest
 from nle_utils.glyph import G
 
+from nle_code_wrapper.bot.pathfinder.grid import MovementGrid, build_move_mask
 from nle_code_wrapper.bot.strategies import ascend_stairs, goto_room, goto_unexplored_room
-from nle_code_wrapper.bot.strategies.goto import goto_feature_direction
+from nle_code_wrapper.bot.strategies.goto import goto_closest, goto_feature_direction
 from nle_code_wrapper.envs.minihack.play_minihack import parse_minihack_args
 from nle_code_wrapper.utils import utils
 from nle_code_wrapper.utils.strategies import (
@@ -15,6 +18,41 @@ from nle_code_wrapper.utils.strategies import (
 from nle_code_wrapper.utils.tests import create_bot
 
 
+def test_goto_closest_by_cost():
+    """
+    The closest position is the cheapest one to reach, not the one with the fewest steps
+    """
+    chars = np.array(
+        [
+            list("|||||||||"),
+            list("|@#A|||||"),
+            list("|.|||||||"),
+            list("|.....B||"),
+            list("|||||||||"),
+        ]
+    )
+    passable = np.isin(chars, [".", "#", "@", "A", "B"])
+    moves = build_move_mask(passable, np.zeros(passable.shape, bool))
+    # A is behind a trap
+    costs = np.where(chars == "#", 1000, 1).astype(np.int32)
+    start, a, b = (tuple(np.argwhere(chars == c)[0]) for c in "@AB")
+
+    steps = MovementGrid(moves, np.ones(passable.shape, np.int32), start).distances(start)
+    assert steps[a] < steps[b]
+
+    grid = MovementGrid(moves, costs, start)
+    moved = []
+    bot = SimpleNamespace(
+        pathfinder=SimpleNamespace(
+            get_path_to_nearest=lambda goals: grid.nearest_path(start, goals),
+            goto=lambda goal, path: moved.append((goal, path)),
+        )
+    )
+    assert goto_closest(bot, [a, b])
+    assert moved[0][0] == b and moved[0][1][0] == start
+    assert not goto_closest(bot, [])
+
+
 @pytest.mark.usefixtures("register_components")
 class TestGoTo(object):
     @pytest.mark.parametrize("env", ["CustomMiniHack-Premapped-Corridor-R3-v0"])
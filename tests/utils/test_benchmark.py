@@ -0,0 +1,33 @@
+import json
+
+import numpy as np
+import pytest
+
+from nle_code_wrapper.utils.benchmark import DEFAULT_SNAPSHOTS, main, run
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    """
+    The first snapshot of every category of the corpus, full runs are done with `main`.
+    """
+    data = np.load(DEFAULT_SNAPSHOTS)
+    _, index = np.unique(data["categories"], return_index=True)
+    path = tmp_path / "snapshots.npz"
+    np.savez_compressed(path, **{key: data[key][index] for key in ("glyphs", "blstats", "categories")})
+    return path
+
+
+class TestBenchmark(object):
+    def test_run(self, snapshots):
+        results = run(snapshots, repeats=1)
+        assert results["num_snapshots"] == len(np.unique(np.load(DEFAULT_SNAPSHOTS)["categories"]))
+        for name in ["create_movements_grid", "distances", "get_path_to", "reachable", "find_tactical_positions"]:
+            assert results["results"]["all"][name]["calls"] > 0
+        assert "MiniHack-CorridorBattle-v0" in results["results"]
+
+    def test_output(self, snapshots, tmp_path):
+        output = tmp_path / "results.json"
+        main([f"--snapshots={snapshots}", f"--output={output}", "--repeats=1"])
+        results = json.loads(output.read_text())
+        assert results["repeats"] == 1 and results["snapshots"] == str(snapshots)
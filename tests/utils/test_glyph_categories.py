@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from nle import nethack
+from nle_utils.glyph import G
+
+from nle_code_wrapper.utils import utils
+from nle_code_wrapper.utils.glyph_categories import CATEGORY_GLYPHS, GC, glyph_categories, is_category
+
+
+@pytest.fixture
+def glyphs():
+    glyphs = np.random.RandomState(0).randint(-1, nethack.MAX_GLYPH, (21, 79)).astype(np.int16)
+    # make sure the rare categories are present
+    for i, category_glyphs in enumerate(CATEGORY_GLYPHS.values()):
+        glyphs[i // 79, i % 79] = min(category_glyphs)
+    return glyphs
+
+
+def test_categories_match_isin(glyphs):
+    categories = glyph_categories(glyphs)
+    for category, category_glyphs in CATEGORY_GLYPHS.items():
+        np.testing.assert_array_equal(is_category(categories, category), utils.isin(glyphs, category_glyphs))
+
+    np.testing.assert_array_equal(
+        is_category(categories, GC.WALL | GC.DOOR_CLOSED | GC.BOULDER),
+        utils.isin(glyphs, G.WALL, G.DOOR_CLOSED, G.BOULDER),
+    )
+
+
+def test_invalid_glyphs():
+    glyphs = np.array([[-1, nethack.MAX_GLYPH, min(G.WALL)]], np.int16)
+    np.testing.assert_array_equal(glyph_categories(glyphs), [[0, 0, GC.WALL]])
@@ -1,9 +1,20 @@
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
+from nle_utils.glyph import SS
 
+from nle_code_wrapper.bot.level import Level
 from nle_code_wrapper.bot.strategies import explore_corridor_systematically, goto_corridor, goto_room, open_doors
+from nle_code_wrapper.bot.strategy import DeadEnds
 from nle_code_wrapper.envs.minihack.play_minihack import parse_minihack_args
 from nle_code_wrapper.utils import utils
-from nle_code_wrapper.utils.strategies import corridor_detection
+from nle_code_wrapper.utils.strategies import (
+    _label_dungeon_features,
+    corridor_detection,
+    dungeon_feature_masks,
+    label_dungeon_features,
+)
 from nle_code_wrapper.utils.tests import create_bot
 
 
@@ -50,3 +61,72 @@ class TestFeatures(object):
         assert labeled_corridors[door_position] != 0
         assert labeled_corridors[corridor_position] != 0
         assert labeled_corridors[room_position] == 0
+
+
+def test_label_dungeon_features_cache():
+    level = Level(0, 1)
+    glyphs = np.full(level.walkable.shape, SS.S_stone, np.int16)
+    glyphs[1:4, 1:5] = SS.S_room
+    glyphs[2, 5] = SS.S_vodoor
+    glyphs[2, 6:9] = SS.S_corr
+    blstats = SimpleNamespace(y=2, x=2)
+    bot = SimpleNamespace(current_level=level)
+
+    level.update(glyphs, blstats)
+    labels, num_rooms, num_corridors = label_dungeon_features(bot)
+    assert (num_rooms, num_corridors) == (1, 1)
+    assert labels[2, 2] == 1 and labels[2, 5] == labels[2, 8] == 2
+    assert label_dungeon_features(bot)[0] is labels
+
+    # the corridor continues, only its labels are updated
+    glyphs[2, 9] = SS.S_corr
+    glyphs[5, 1] = SS.S_corr
+    level.update(glyphs, blstats)
+    new_labels, num_rooms, num_corridors = label_dungeon_features(bot)
+    assert (num_rooms, num_corridors) == (1, 2)
+    assert new_labels[2, 9] == new_labels[2, 5]
+    np.testing.assert_array_equal(new_labels, _label_dungeon_features(level, None).labeled_features)
+
+
+def test_dungeon_feature_masks():
+    objects = np.full((3, 7), SS.S_stone, np.int16)
+    objects[:, :3] = SS.S_room
+    objects[1, 4] = SS.S_corr
+    walkable = objects != SS.S_stone
+
+    # an item in the room, one between the room and the corridor and one far away
+    objects[1, 1] = objects[1, 3] = objects[1, 6] = -1
+    walkable[1, 1] = walkable[1, 3] = walkable[1, 6] = True
+
+    rooms, corridors = dungeon_feature_masks(objects, walkable)
+    assert rooms[1, 1] and not corridors[1, 1]
+    assert corridors[1, 3] and not rooms[1, 3]
+    assert not rooms[1, 6] and not corridors[1, 6]
+
+
+def test_dead_ends():
+    level = Level(0, 1)
+    glyphs = np.full(level.walkable.shape, SS.S_stone, np.int16)
+    glyphs[1:4, 1:5] = SS.S_room
+    glyphs[2, 5] = SS.S_vodoor
+    glyphs[2, 6:9] = SS.S_corr
+    blstats = SimpleNamespace(y=2, x=8)
+    bot = SimpleNamespace(
+        current_level=level,
+        entity=SimpleNamespace(position=(2, 8)),
+        entities=[],
+        inventory=SimpleNamespace(can_squeeze=True),
+    )
+
+    level.update(glyphs, blstats)
+    dead_ends = DeadEnds(bot)
+    assert dead_ends.update() == {(2, 8)}
+
+    # the corridor continues
+    glyphs[2, 9] = SS.S_corr
+    level.update(glyphs, blstats)
+    assert dead_ends.update() == set()
+
+    # a monster blocks it
+    bot.entities = [SimpleNamespace(position=(2, 9))]
+    assert dead_ends.update() == {(2, 8)}